@@ -0,0 +1,59 @@
+"""instrument_fk_ondelete_cascade
+
+Revision ID: 6b2c3d4e5f6a
+Revises: 5a1b2c3d4e5f
+Create Date: 2026-10-16
+
+Каскадное удаление дочерних строк инструмента переносится из ORM
+(cascade="all, delete-orphan") на уровень PostgreSQL (ON DELETE CASCADE).
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = '6b2c3d4e5f6a'
+down_revision: Union[str, None] = '5a1b2c3d4e5f'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Таблицы со ссылкой instrument_id → instruments.id
+CHILD_TABLES = ('candles_daily', 'indicators_daily', 'signals', 'trades')
+
+
+def table_exists(table_name: str) -> bool:
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    return table_name in inspector.get_table_names()
+
+
+def instrument_fk_name(table_name: str) -> Union[str, None]:
+    """Имя FK instrument_id → instruments.id (если есть)."""
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    for fk in inspector.get_foreign_keys(table_name):
+        if fk['referred_table'] == 'instruments' and fk['constrained_columns'] == ['instrument_id']:
+            return fk['name']
+    return None
+
+
+def _recreate_fk(ondelete: Union[str, None]) -> None:
+    for table in CHILD_TABLES:
+        if not table_exists(table):
+            continue
+        existing = instrument_fk_name(table)
+        if existing:
+            op.drop_constraint(existing, table, type_='foreignkey')
+        name = existing or f'{table}_instrument_id_fkey'
+        op.create_foreign_key(
+            name, table, 'instruments',
+            ['instrument_id'], ['id'],
+            ondelete=ondelete,
+        )
+
+
+def upgrade() -> None:
+    _recreate_fk('CASCADE')
+
+
+def downgrade() -> None:
+    _recreate_fk(None)
@@ -0,0 +1,50 @@
+"""partial_indexes
+
+Revision ID: 7c3d4e5f6a7b
+Revises: 6b2c3d4e5f6a
+Create Date: 2026-10-16
+
+Частичные индексы для горячих булевых фильтров:
+- instruments WHERE is_liquid = true
+- signals WHERE is_executed = false
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = '7c3d4e5f6a7b'
+down_revision: Union[str, None] = '6b2c3d4e5f6a'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def table_exists(table_name: str) -> bool:
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    return table_name in inspector.get_table_names()
+
+
+def index_exists(table_name: str, index_name: str) -> bool:
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    indexes = [i['name'] for i in inspector.get_indexes(table_name)]
+    return index_name in indexes
+
+
+def upgrade() -> None:
+    if table_exists('instruments') and not index_exists('instruments', 'ix_instruments_liquid'):
+        op.create_index(
+            'ix_instruments_liquid', 'instruments', ['avg_volume_rub'],
+            postgresql_where=sa.text('is_liquid = true'),
+        )
+
+    if table_exists('signals') and not index_exists('signals', 'ix_signals_pending'):
+        op.create_index(
+            'ix_signals_pending', 'signals', ['signal_date'],
+            postgresql_where=sa.text('is_executed = false'),
+        )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_signals_pending', table_name='signals')
+    op.drop_index('ix_instruments_liquid', table_name='instruments')
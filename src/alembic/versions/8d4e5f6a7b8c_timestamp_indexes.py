@@ -0,0 +1,43 @@
+"""timestamp_indexes
+
+Revision ID: 8d4e5f6a7b8c
+Revises: 7c3d4e5f6a7b
+Create Date: 2026-10-16
+
+B-tree индексы по signals.signal_time и trades.entry_time
+для фильтров «за сегодня» (диапазон [начало дня, следующий день)).
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = '8d4e5f6a7b8c'
+down_revision: Union[str, None] = '7c3d4e5f6a7b'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def table_exists(table_name: str) -> bool:
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    return table_name in inspector.get_table_names()
+
+
+def index_exists(table_name: str, index_name: str) -> bool:
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    indexes = [i['name'] for i in inspector.get_indexes(table_name)]
+    return index_name in indexes
+
+
+def upgrade() -> None:
+    if table_exists('signals') and not index_exists('signals', 'ix_signals_signal_time'):
+        op.create_index('ix_signals_signal_time', 'signals', ['signal_time'])
+
+    if table_exists('trades') and not index_exists('trades', 'ix_trades_entry_time'):
+        op.create_index('ix_trades_entry_time', 'trades', ['entry_time'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_trades_entry_time', table_name='trades')
+    op.drop_index('ix_signals_signal_time', table_name='signals')
@@ -0,0 +1,40 @@
+"""server_side_created_at
+
+Revision ID: 9e5f6a7b8c9d
+Revises: 8d4e5f6a7b8c
+Create Date: 2026-10-16
+
+signals.created_at и trades.created_at заполняются на стороне БД
+(timezone('utc', now())) вместо datetime.utcnow() в приложении.
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = '9e5f6a7b8c9d'
+down_revision: Union[str, None] = '8d4e5f6a7b8c'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+TABLES = ('signals', 'trades')
+
+
+def table_exists(table_name: str) -> bool:
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    return table_name in inspector.get_table_names()
+
+
+def upgrade() -> None:
+    for table in TABLES:
+        if table_exists(table):
+            op.alter_column(
+                table, 'created_at',
+                server_default=sa.text("timezone('utc', now())"),
+            )
+
+
+def downgrade() -> None:
+    for table in TABLES:
+        if table_exists(table):
+            op.alter_column(table, 'created_at', server_default=None)
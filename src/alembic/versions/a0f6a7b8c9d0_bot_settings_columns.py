@@ -0,0 +1,75 @@
+"""bot_settings_columns
+
+Revision ID: a0f6a7b8c9d0
+Revises: 9e5f6a7b8c9d
+Create Date: 2026-10-16
+
+Приводит bot_settings к модели BotSettings: миграция 5a1b2c3d4e5f
+создавала total_orders, а модель и бот используют total_orders_placed;
+paused_until и created_at в таблице не было, total_pnl_rub — в модели.
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = 'a0f6a7b8c9d0'
+down_revision: Union[str, None] = '9e5f6a7b8c9d'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def table_exists(table_name: str) -> bool:
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    return table_name in inspector.get_table_names()
+
+
+# Метки в комментариях колонок: downgrade откатывает только то, что сделал
+# upgrade, и не трогает колонки, бывшие в таблице до этой ревизии
+ADDED = f'{revision}:added'
+RENAMED = f'{revision}:renamed'
+
+
+def columns_info(table_name: str) -> dict:
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    return {c['name']: c for c in inspector.get_columns(table_name)}
+
+
+def add_marked_column(column: sa.Column) -> None:
+    column.comment = ADDED
+    op.add_column('bot_settings', column)
+
+
+def upgrade() -> None:
+    if not table_exists('bot_settings'):
+        return
+    columns = columns_info('bot_settings')
+
+    if 'total_orders' in columns and 'total_orders_placed' not in columns:
+        op.alter_column('bot_settings', 'total_orders', new_column_name='total_orders_placed')
+        op.alter_column('bot_settings', 'total_orders_placed', comment=RENAMED)
+    elif 'total_orders_placed' not in columns:
+        add_marked_column(sa.Column('total_orders_placed', sa.Integer(), server_default='0'))
+
+    if 'total_pnl_rub' not in columns:
+        add_marked_column(sa.Column('total_pnl_rub', sa.Float(), server_default='0'))
+    if 'paused_until' not in columns:
+        add_marked_column(sa.Column('paused_until', sa.DateTime(), nullable=True))
+    if 'created_at' not in columns:
+        add_marked_column(sa.Column('created_at', sa.DateTime(), nullable=True))
+
+
+def downgrade() -> None:
+    if not table_exists('bot_settings'):
+        return
+    columns = columns_info('bot_settings')
+
+    for name in ('created_at', 'paused_until', 'total_pnl_rub', 'total_orders_placed'):
+        if name in columns and columns[name].get('comment') == ADDED:
+            op.drop_column('bot_settings', name)
+
+    placed = columns.get('total_orders_placed')
+    if placed and placed.get('comment') == RENAMED and 'total_orders' not in columns:
+        op.alter_column('bot_settings', 'total_orders_placed', comment=None)
+        op.alter_column('bot_settings', 'total_orders_placed', new_column_name='total_orders')
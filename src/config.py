@@ -5,15 +5,15 @@
 - config.yaml: параметры стратегий, риска, расписания
 - .env: секреты (токены, пароли)
 """
+import logging
 import os
 from dataclasses import dataclass, field
+from functools import cached_property
 from pathlib import Path
 from typing import List
 
-import yaml
-from dotenv import load_dotenv
-
-load_dotenv()
+# .env читается один раз — при первом вызове load_config(), а не при импорте
+_DOTENV_LOADED = False
 
 
 # ═══════════════════════════════════════════════════════════════════════════════
@@ -25,6 +25,9 @@ class TinkoffConfig:
     """Настройки Tinkoff API."""
     token: str
     account_id: str = ""
+    state_cache_ttl: float = 1.0  # TTL кеша стоп-заявок/позиций, сек
+    rpc_timeout: float = 10.0     # Дедлайн одного читающего RPC, сек
+    rpc_retries: int = 3          # Попыток при UNAVAILABLE / RESOURCE_EXHAUSTED
 
 
 @dataclass
@@ -44,14 +47,25 @@ class DatabaseConfig:
     user: str
     password: str
 
-    @property
+    # Пул соединений (AsyncEngine)
+    pool_size: int = 20
+    max_overflow: int = 30
+    pool_pre_ping: bool = True
+    pool_recycle: int = 3600              # сек; пересоздаём соединения до idle-таймаутов
+    pool_timeout: int = 30                # сек ожидания свободного соединения
+    # Кэш подготовленных запросов asyncpg (на соединение)
+    statement_cache_size: int = 1024
+    # Кэш скомпилированных SQL SQLAlchemy (на движок)
+    query_cache_size: int = 1200
+
+    @cached_property
     def url(self) -> str:
-        """Строка подключения для SQLAlchemy (async)."""
+        """Строка подключения для SQLAlchemy (async). Вычисляется один раз."""
         return f"postgresql+asyncpg://{self.user}:{self.password}@{self.host}:{self.port}/{self.name}"
 
-    @property
+    @cached_property
     def sync_url(self) -> str:
-        """Синхронная строка подключения."""
+        """Синхронная строка подключения. Вычисляется один раз."""
         return f"postgresql://{self.user}:{self.password}@{self.host}:{self.port}/{self.name}"
 
 
@@ -155,6 +169,7 @@ class Config:
     schedule: ScheduleConfig
     free_trading: FreeTradeConfig
     dry_run: bool = True
+    log_level: int = logging.INFO
 
 
 # ═══════════════════════════════════════════════════════════════════════════════
@@ -192,13 +207,24 @@ def load_config(config_path: str = "config.yaml") -> Config:
         ValueError: Если не хватает обязательных переменных
         FileNotFoundError: Если config.yaml не найден
     """
+    # yaml и dotenv импортируются лениво: модуль config часто импортируется
+    # только ради dataclass-ов, и платить за их загрузку там незачем
+    import yaml
+    from dotenv import load_dotenv
+
+    global _DOTENV_LOADED
+    if not _DOTENV_LOADED:
+        load_dotenv(override=False)
+        _DOTENV_LOADED = True
+
     # Проверяем наличие файла
     if not Path(config_path).exists():
         raise FileNotFoundError(f"Config file not found: {config_path}")
 
     # Загружаем YAML
     with open(config_path, "r", encoding="utf-8") as f:
-        cfg = yaml.safe_load(f)
+        loader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+        cfg = yaml.load(f, Loader=loader)
 
     # Валидация обязательных env-переменных
     required_env = ["TINKOFF_TOKEN", "TELEGRAM_BOT_TOKEN", "TELEGRAM_CHAT_ID"]
@@ -230,6 +256,9 @@ def load_config(config_path: str = "config.yaml") -> Config:
         tinkoff=TinkoffConfig(
             token=os.getenv("TINKOFF_TOKEN", ""),
             account_id=os.getenv("TINKOFF_ACCOUNT_ID", ""),
+            state_cache_ttl=float(os.getenv("TINKOFF_STATE_CACHE_TTL", "1.0")),
+            rpc_timeout=float(os.getenv("TINKOFF_RPC_TIMEOUT", "10")),
+            rpc_retries=int(os.getenv("TINKOFF_RPC_RETRIES", "3")),
         ),
         telegram=TelegramConfig(
             bot_token=os.getenv("TELEGRAM_BOT_TOKEN", ""),
@@ -242,6 +271,13 @@ def load_config(config_path: str = "config.yaml") -> Config:
             name=os.getenv("POSTGRES_DB", "trading_bot"),
             user=os.getenv("POSTGRES_USER", "trader"),
             password=os.getenv("POSTGRES_PASSWORD", ""),
+            pool_size=int(os.getenv("POSTGRES_POOL_SIZE", "20")),
+            max_overflow=int(os.getenv("POSTGRES_MAX_OVERFLOW", "30")),
+            pool_pre_ping=os.getenv("POSTGRES_POOL_PRE_PING", "true").lower() in ("1", "true", "yes"),
+            pool_recycle=int(os.getenv("POSTGRES_POOL_RECYCLE", "3600")),
+            pool_timeout=int(os.getenv("POSTGRES_POOL_TIMEOUT", "30")),
+            statement_cache_size=int(os.getenv("POSTGRES_STATEMENT_CACHE_SIZE", "1024")),
+            query_cache_size=int(os.getenv("POSTGRES_QUERY_CACHE_SIZE", "1200")),
         ),
         trading=TradingConfig(
             deposit_rub=float(os.getenv("DEPOSIT_RUB", "1000000")),
@@ -293,4 +329,5 @@ def load_config(config_path: str = "config.yaml") -> Config:
             tp_atr_multiplier=free_trading_cfg.get("tp_atr_multiplier", 3.0),
         ),
         dry_run=safety_cfg.get("dry_run", True),
+        log_level=getattr(logging, os.getenv("LOG_LEVEL", "INFO").upper(), logging.INFO),
     )
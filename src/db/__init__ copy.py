@@ -1,8 +0,0 @@
-"""База данных."""
-from db.models import Base, Instrument, Signal, Trade
-from db.repository import Repository
-
-__all__ = [
-    "Base", "Instrument", "Signal", "Trade",
-    "Repository"
-]
\ No newline at end of file
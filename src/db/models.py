@@ -10,15 +10,24 @@
 - signals: торговые сигналы
 - trades: завершённые сделки
 """
-from datetime import datetime, date
+import datetime as dt
+from typing import Any, Dict, List, Optional
 
 from sqlalchemy import (
-    Column, Integer, String, Float, DateTime, Date, Boolean, Text,
-    ForeignKey, Index, UniqueConstraint, JSON
+    Integer, String, Float, DateTime, Date, Boolean, Text,
+    ForeignKey, Index, UniqueConstraint, JSON, text
 )
-from sqlalchemy.orm import declarative_base, relationship
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column, relationship
 
-Base = declarative_base()
+
+# Текущее время UTC на стороне БД (как datetime.utcnow, но без передачи
+# значения в INSERT/UPDATE)
+UTC_NOW = text("timezone('utc', now())")
+
+
+class Base(DeclarativeBase):
+    """Базовый класс моделей (SQLAlchemy 2.0, типизированные Mapped[] атрибуты)."""
 
 
 # ═══════════════════════════════════════════════════════════════════════════════
@@ -37,33 +46,34 @@ class BotSettings(Base):
     """
     __tablename__ = "bot_settings"
 
-    id = Column(Integer, primary_key=True, default=1)
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, default=1)
     
     # === ГЛАВНЫЙ KILL SWITCH ===
     # False = бот НЕ выставляет новые заявки и НЕ следит за позициями
-    is_active = Column(Boolean, default=False, nullable=False)
+    is_active: Mapped[bool] = mapped_column(Boolean, default=False, nullable=False)
     
     # Режим работы: "auto" | "manual" | "monitor_only"
     # auto = полный автомат (SL/TP выставляются автоматически)
     # manual = только уведомления, заявки не выставляются
     # monitor_only = только мониторинг позиций, без действий
-    mode = Column(String(20), default="manual", nullable=False)
+    mode: Mapped[str] = mapped_column(String(20), default="manual", nullable=False)
     
     # Причина последнего изменения (для аудита)
-    last_change_reason = Column(String(200))
-    last_change_by = Column(String(50))  # telegram user_id или "system"
-    last_change_at = Column(DateTime, default=datetime.utcnow)
+    last_change_reason: Mapped[Optional[str]] = mapped_column(String(200))
+    last_change_by: Mapped[Optional[str]] = mapped_column(String(50))  # telegram user_id или "system"
+    last_change_at: Mapped[Optional[dt.datetime]] = mapped_column(DateTime, default=dt.datetime.utcnow)
     
     # Пауза до определённого времени (опционально)
-    paused_until = Column(DateTime, nullable=True)
+    paused_until: Mapped[Optional[dt.datetime]] = mapped_column(DateTime, nullable=True)
     
     # Счётчики для статистики
-    total_orders_placed = Column(Integer, default=0)
-    total_sl_triggered = Column(Integer, default=0)
-    total_tp_triggered = Column(Integer, default=0)
+    total_orders_placed: Mapped[Optional[int]] = mapped_column(Integer, default=0)
+    total_sl_triggered: Mapped[Optional[int]] = mapped_column(Integer, default=0)
+    total_tp_triggered: Mapped[Optional[int]] = mapped_column(Integer, default=0)
+    total_pnl_rub: Mapped[Optional[float]] = mapped_column(Float, default=0)
     
-    created_at = Column(DateTime, default=datetime.utcnow)
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    created_at: Mapped[Optional[dt.datetime]] = mapped_column(DateTime, default=dt.datetime.utcnow)
+    updated_at: Mapped[Optional[dt.datetime]] = mapped_column(DateTime, default=dt.datetime.utcnow, onupdate=dt.datetime.utcnow)
 
 
 class TrackedOrderDB(Base):
@@ -75,53 +85,53 @@ class TrackedOrderDB(Base):
     """
     __tablename__ = "tracked_orders"
 
-    id = Column(Integer, primary_key=True)
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
     
     # Идентификаторы заявки
-    order_id = Column(String(50), unique=True, nullable=False, index=True)
-    ticker = Column(String(20), nullable=False)
-    figi = Column(String(20), nullable=False)
+    order_id: Mapped[str] = mapped_column(String(50), unique=True, nullable=False, index=True)
+    ticker: Mapped[str] = mapped_column(String(20), nullable=False)
+    figi: Mapped[str] = mapped_column(String(20), nullable=False)
     
     # Тип заявки: entry_buy, stop_loss, take_profit
-    order_type = Column(String(20), nullable=False)
+    order_type: Mapped[str] = mapped_column(String(20), nullable=False)
     
     # Количество (в лотах)
-    quantity = Column(Integer, nullable=False)
-    lot_size = Column(Integer, default=1)
+    quantity: Mapped[int] = mapped_column(Integer, nullable=False)
+    lot_size: Mapped[Optional[int]] = mapped_column(Integer, default=1)
     
     # Цены
-    entry_price = Column(Float, nullable=False)
-    stop_price = Column(Float, nullable=False)
-    target_price = Column(Float, nullable=False)
+    entry_price: Mapped[float] = mapped_column(Float, nullable=False)
+    stop_price: Mapped[float] = mapped_column(Float, nullable=False)
+    target_price: Mapped[float] = mapped_column(Float, nullable=False)
     
     # Офсеты для расчёта (в рублях)
-    stop_offset = Column(Float, default=0)
-    take_offset = Column(Float, default=0)
-    atr = Column(Float, default=0)
+    stop_offset: Mapped[Optional[float]] = mapped_column(Float, default=0)
+    take_offset: Mapped[Optional[float]] = mapped_column(Float, default=0)
+    atr: Mapped[Optional[float]] = mapped_column(Float, default=0)
     
     # Статус: pending, executed, cancelled, expired
-    status = Column(String(20), default="pending", nullable=False)
+    status: Mapped[str] = mapped_column(String(20), default="pending", nullable=False)
     
     # Связанные заявки (для entry → SL/TP)
-    parent_order_id = Column(String(50), nullable=True)  # ID родительской entry заявки
-    sl_order_id = Column(String(50), nullable=True)
-    tp_order_id = Column(String(50), nullable=True)
+    parent_order_id: Mapped[Optional[str]] = mapped_column(String(50), nullable=True)  # ID родительской entry заявки
+    sl_order_id: Mapped[Optional[str]] = mapped_column(String(50), nullable=True)
+    tp_order_id: Mapped[Optional[str]] = mapped_column(String(50), nullable=True)
     
     # Результат исполнения
-    executed_price = Column(Float, nullable=True)
-    executed_at = Column(DateTime, nullable=True)
-    execution_reason = Column(String(50), nullable=True)  # filled, sl_triggered, tp_triggered, manual
+    executed_price: Mapped[Optional[float]] = mapped_column(Float, nullable=True)
+    executed_at: Mapped[Optional[dt.datetime]] = mapped_column(DateTime, nullable=True)
+    execution_reason: Mapped[Optional[str]] = mapped_column(String(50), nullable=True)  # filled, sl_triggered, tp_triggered, manual
     
     # PnL (заполняется при закрытии)
-    pnl_rub = Column(Float, nullable=True)
-    pnl_pct = Column(Float, nullable=True)
+    pnl_rub: Mapped[Optional[float]] = mapped_column(Float, nullable=True)
+    pnl_pct: Mapped[Optional[float]] = mapped_column(Float, nullable=True)
     
     # Метаданные
-    created_at = Column(DateTime, default=datetime.utcnow)
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    created_at: Mapped[Optional[dt.datetime]] = mapped_column(DateTime, default=dt.datetime.utcnow)
+    updated_at: Mapped[Optional[dt.datetime]] = mapped_column(DateTime, default=dt.datetime.utcnow, onupdate=dt.datetime.utcnow)
     
     # Кто создал: telegram_user_id или "scheduler"
-    created_by = Column(String(50), nullable=True)
+    created_by: Mapped[Optional[str]] = mapped_column(String(50), nullable=True)
 
     __table_args__ = (
         Index("ix_tracked_orders_status", "status"),
@@ -137,62 +147,95 @@ class Instrument(Base):
     """Справочник инструментов (акции/фьючерсы)."""
     __tablename__ = "instruments"
 
-    id = Column(Integer, primary_key=True)
-    figi = Column(String(20), unique=True, nullable=False, index=True)
-    ticker = Column(String(20), nullable=False, index=True)
-    name = Column(String(200))
-    instrument_type = Column(String(20))  # share, future
-    currency = Column(String(10), default="rub")
-    exchange = Column(String(50))
-    lot_size = Column(Integer, default=1)
-    min_price_increment = Column(Float)
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    figi: Mapped[str] = mapped_column(String(20), unique=True, nullable=False, index=True)
+    ticker: Mapped[str] = mapped_column(String(20), nullable=False, index=True)
+    name: Mapped[Optional[str]] = mapped_column(String(200))
+    instrument_type: Mapped[Optional[str]] = mapped_column(String(20))  # share, future
+    currency: Mapped[Optional[str]] = mapped_column(String(10), default="rub")
+    exchange: Mapped[Optional[str]] = mapped_column(String(50))
+    lot_size: Mapped[Optional[int]] = mapped_column(Integer, default=1)
+    min_price_increment: Mapped[Optional[float]] = mapped_column(Float)
     
     # Для фьючерсов
-    expiration_date = Column(Date)
-    basic_asset = Column(String(20))  # USD, RTS, etc
+    expiration_date: Mapped[Optional[dt.date]] = mapped_column(Date)
+    basic_asset: Mapped[Optional[str]] = mapped_column(String(20))  # USD, RTS, etc
     
     # Статус
-    is_active = Column(Boolean, default=True)
-    is_liquid = Column(Boolean, default=False)
+    is_active: Mapped[Optional[bool]] = mapped_column(Boolean, default=True)
+    is_liquid: Mapped[Optional[bool]] = mapped_column(Boolean, default=False)
     
     # Метаданные ликвидности (обновляются ежедневно)
-    avg_volume_rub = Column(Float)
-    avg_spread_pct = Column(Float)
+    avg_volume_rub: Mapped[Optional[float]] = mapped_column(Float)
+    avg_spread_pct: Mapped[Optional[float]] = mapped_column(Float)
     
-    created_at = Column(DateTime, default=datetime.utcnow)
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    created_at: Mapped[Optional[dt.datetime]] = mapped_column(DateTime, default=dt.datetime.utcnow)
+    updated_at: Mapped[Optional[dt.datetime]] = mapped_column(DateTime, default=dt.datetime.utcnow, onupdate=dt.datetime.utcnow)
+
+    # Связи (только явная загрузка: lazy="raise" ловит случайные N+1).
+    # Каскадное удаление выполняет PostgreSQL через ON DELETE CASCADE на FK,
+    # поэтому сессия не загружает дочерние коллекции при удалении инструмента.
+    candles: Mapped[List["CandleDaily"]] = relationship("CandleDaily", back_populates="instrument", lazy="raise", passive_deletes=True)
+    indicators: Mapped[List["IndicatorDaily"]] = relationship("IndicatorDaily", back_populates="instrument", lazy="raise", passive_deletes=True)
+    signals: Mapped[List["Signal"]] = relationship("Signal", back_populates="instrument", lazy="raise", passive_deletes=True)
 
-    # Связи
-    candles = relationship("CandleDaily", back_populates="instrument", cascade="all, delete-orphan")
-    indicators = relationship("IndicatorDaily", back_populates="instrument", cascade="all, delete-orphan")
-    signals = relationship("Signal", back_populates="instrument", cascade="all, delete-orphan")
+    __table_args__ = (
+        # Частичный индекс только по ликвидным строкам: покрывает
+        # WHERE is_liquid = true ORDER BY avg_volume_rub DESC
+        Index(
+            "ix_instruments_liquid", "avg_volume_rub",
+            postgresql_where=text("is_liquid = true"),
+        ),
+    )
 
 
 class CandleDaily(Base):
     """Дневные свечи (агрегированные из часовых 10-19 МСК)."""
     __tablename__ = "candles_daily"
 
-    id = Column(Integer, primary_key=True)
-    instrument_id = Column(Integer, ForeignKey("instruments.id"), nullable=False)
-    date = Column(Date, nullable=False)
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    instrument_id: Mapped[int] = mapped_column(Integer, ForeignKey("instruments.id", ondelete="CASCADE"), nullable=False)
+    date: Mapped[dt.date] = mapped_column(Date, nullable=False)
     
-    open = Column(Float, nullable=False)
-    high = Column(Float, nullable=False)
-    low = Column(Float, nullable=False)
-    close = Column(Float, nullable=False)
-    volume = Column(Float)
+    open: Mapped[float] = mapped_column(Float, nullable=False)
+    high: Mapped[float] = mapped_column(Float, nullable=False)
+    low: Mapped[float] = mapped_column(Float, nullable=False)
+    close: Mapped[float] = mapped_column(Float, nullable=False)
+    volume: Mapped[Optional[float]] = mapped_column(Float)
     
     # Источник данных
-    source = Column(String(20), default="api_hourly")  # api_hourly, api_daily
+    source: Mapped[Optional[str]] = mapped_column(String(20), default="api_hourly")  # api_hourly, api_daily
     
-    created_at = Column(DateTime, default=datetime.utcnow)
+    created_at: Mapped[Optional[dt.datetime]] = mapped_column(DateTime, default=dt.datetime.utcnow)
 
-    instrument = relationship("Instrument", back_populates="candles")
+    instrument: Mapped["Instrument"] = relationship("Instrument", back_populates="candles", lazy="raise")
 
     __table_args__ = (
         UniqueConstraint("instrument_id", "date", name="uq_candle_instrument_date"),
         Index("ix_candles_date", "date"),
     )
+    # Горячий путь гидрации строк: не сверяем количество удалённых строк при flush
+    __mapper_args__ = {"confirm_deleted_rows": False}
+
+    @classmethod
+    async def bulk_upsert(cls, session, rows: List[Dict[str, Any]]) -> None:
+        """
+        Пакетная вставка свечей одним INSERT ... ON CONFLICT DO NOTHING.
+
+        Строки передаются словарями (не ORM-объектами), поэтому unit-of-work
+        не участвует. Дубликаты по (instrument_id, date) пропускаются.
+        Коммит — на стороне вызывающего.
+
+        Args:
+            session: AsyncSession
+            rows: Список словарей с полями CandleDaily
+        """
+        if not rows:
+            return
+        stmt = pg_insert(cls).values(rows).on_conflict_do_nothing(
+            index_elements=["instrument_id", "date"]
+        )
+        await session.execute(stmt)
 
 
 class IndicatorDaily(Base):
@@ -203,47 +246,47 @@ class IndicatorDaily(Base):
     """
     __tablename__ = "indicators_daily"
 
-    id = Column(Integer, primary_key=True)
-    instrument_id = Column(Integer, ForeignKey("instruments.id"), nullable=False)
-    date = Column(Date, nullable=False)
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    instrument_id: Mapped[int] = mapped_column(Integer, ForeignKey("instruments.id", ondelete="CASCADE"), nullable=False)
+    date: Mapped[dt.date] = mapped_column(Date, nullable=False)
 
     # Цена закрытия
-    close = Column(Float)
+    close: Mapped[Optional[float]] = mapped_column(Float)
 
     # ATR (14)
-    atr = Column(Float)
-    atr_pct = Column(Float)  # ATR в % от цены
+    atr: Mapped[Optional[float]] = mapped_column(Float)
+    atr_pct: Mapped[Optional[float]] = mapped_column(Float)  # ATR в % от цены
 
     # Bollinger Bands (20, 2)
-    bb_upper = Column(Float)
-    bb_middle = Column(Float)
-    bb_lower = Column(Float)
-    bb_bandwidth = Column(Float)  # (upper - lower) / middle * 100
+    bb_upper: Mapped[Optional[float]] = mapped_column(Float)
+    bb_middle: Mapped[Optional[float]] = mapped_column(Float)
+    bb_lower: Mapped[Optional[float]] = mapped_column(Float)
+    bb_bandwidth: Mapped[Optional[float]] = mapped_column(Float)  # (upper - lower) / middle * 100
     
     # Позиция цены относительно BB
-    bb_position_pct = Column(Float)  # 0 = на lower, 100 = на upper
-    distance_to_bb_lower_pct = Column(Float)  # расстояние до нижней в %
+    bb_position_pct: Mapped[Optional[float]] = mapped_column(Float)  # 0 = на lower, 100 = на upper
+    distance_to_bb_lower_pct: Mapped[Optional[float]] = mapped_column(Float)  # расстояние до нижней в %
     
     # === EMA (13/26) - система двух скользящих ===
-    ema_13 = Column(Float)  # Быстрая EMA
-    ema_26 = Column(Float)  # Медленная EMA
-    ema_trend = Column(String(10))  # UP / DOWN / WEAK_UP / FLAT
-    ema_diff_pct = Column(Float)  # (ema_13 - ema_26) / ema_26 * 100
-    ema_13_slope = Column(Float)  # Наклон EMA13 за 3 дня в %
-    ema_26_slope = Column(Float)  # Наклон EMA26 за 3 дня в %
-    distance_to_ema_13_pct = Column(Float)  # Расстояние цены от EMA13 в %
-    distance_to_ema_26_pct = Column(Float)  # Расстояние цены от EMA26 в %
+    ema_13: Mapped[Optional[float]] = mapped_column(Float)  # Быстрая EMA
+    ema_26: Mapped[Optional[float]] = mapped_column(Float)  # Медленная EMA
+    ema_trend: Mapped[Optional[str]] = mapped_column(String(10))  # UP / DOWN / WEAK_UP / FLAT
+    ema_diff_pct: Mapped[Optional[float]] = mapped_column(Float)  # (ema_13 - ema_26) / ema_26 * 100
+    ema_13_slope: Mapped[Optional[float]] = mapped_column(Float)  # Наклон EMA13 за 3 дня в %
+    ema_26_slope: Mapped[Optional[float]] = mapped_column(Float)  # Наклон EMA26 за 3 дня в %
+    distance_to_ema_13_pct: Mapped[Optional[float]] = mapped_column(Float)  # Расстояние цены от EMA13 в %
+    distance_to_ema_26_pct: Mapped[Optional[float]] = mapped_column(Float)  # Расстояние цены от EMA26 в %
 
     # Ликвидность за день
-    volume_rub = Column(Float)
-    spread_pct = Column(Float)
+    volume_rub: Mapped[Optional[float]] = mapped_column(Float)
+    spread_pct: Mapped[Optional[float]] = mapped_column(Float)
 
     # Расширяемое поле для новых индикаторов
-    extra = Column(JSON, default={})
+    extra: Mapped[Optional[dict]] = mapped_column(JSON, default={})
     
-    created_at = Column(DateTime, default=datetime.utcnow)
+    created_at: Mapped[Optional[dt.datetime]] = mapped_column(DateTime, default=dt.datetime.utcnow)
 
-    instrument = relationship("Instrument", back_populates="indicators")
+    instrument: Mapped["Instrument"] = relationship("Instrument", back_populates="indicators", lazy="raise")
 
     __table_args__ = (
         UniqueConstraint("instrument_id", "date", name="uq_indicator_instrument_date"),
@@ -256,43 +299,49 @@ class Signal(Base):
     """Торговые сигналы."""
     __tablename__ = "signals"
 
-    id = Column(Integer, primary_key=True)
-    instrument_id = Column(Integer, ForeignKey("instruments.id"), nullable=False)
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    instrument_id: Mapped[int] = mapped_column(Integer, ForeignKey("instruments.id", ondelete="CASCADE"), nullable=False)
 
-    signal_type = Column(String(10))  # BUY, SELL, CLOSE
-    signal_date = Column(Date, nullable=False)
-    signal_time = Column(DateTime)
+    signal_type: Mapped[Optional[str]] = mapped_column(String(10))  # BUY, SELL, CLOSE
+    signal_date: Mapped[dt.date] = mapped_column(Date, nullable=False)
+    signal_time: Mapped[Optional[dt.datetime]] = mapped_column(DateTime)
     
     # Цены
-    price = Column(Float, nullable=False)
-    target_price = Column(Float)
-    stop_price = Column(Float)
+    price: Mapped[float] = mapped_column(Float, nullable=False)
+    target_price: Mapped[Optional[float]] = mapped_column(Float)
+    stop_price: Mapped[Optional[float]] = mapped_column(Float)
     
     # Параметры позиции
-    position_size = Column(Integer)
-    position_value = Column(Float)
-    max_loss = Column(Float)
+    position_size: Mapped[Optional[int]] = mapped_column(Integer)
+    position_value: Mapped[Optional[float]] = mapped_column(Float)
+    max_loss: Mapped[Optional[float]] = mapped_column(Float)
     
     # Причина и стратегия
-    strategy = Column(String(50))  # bollinger_bounce, ema_pullback
-    reason = Column(Text)
-    confidence = Column(Float)
+    strategy: Mapped[Optional[str]] = mapped_column(String(50))  # bollinger_bounce, ema_pullback
+    reason: Mapped[Optional[str]] = mapped_column(Text)
+    confidence: Mapped[Optional[float]] = mapped_column(Float)
 
     # Индикаторы на момент сигнала (для анализа)
-    indicators_snapshot = Column(JSON)
+    indicators_snapshot: Mapped[Optional[dict]] = mapped_column(JSON)
 
     # Статус исполнения
-    is_executed = Column(Boolean, default=False)
-    executed_at = Column(DateTime)
-    executed_price = Column(Float)
+    is_executed: Mapped[Optional[bool]] = mapped_column(Boolean, default=False)
+    executed_at: Mapped[Optional[dt.datetime]] = mapped_column(DateTime)
+    executed_price: Mapped[Optional[float]] = mapped_column(Float)
 
-    created_at = Column(DateTime, default=datetime.utcnow)
+    created_at: Mapped[Optional[dt.datetime]] = mapped_column(DateTime, server_default=UTC_NOW)
 
-    instrument = relationship("Instrument", back_populates="signals")
+    instrument: Mapped["Instrument"] = relationship("Instrument", back_populates="signals", lazy="raise")
 
     __table_args__ = (
         Index("ix_signals_date", "signal_date"),
         Index("ix_signals_instrument", "instrument_id"),
+        Index("ix_signals_signal_time", "signal_time"),
+        # Только неисполненные сигналы: размер O(открытых), а не O(всех)
+        Index(
+            "ix_signals_pending", "signal_date",
+            postgresql_where=text("is_executed = false"),
+        ),
     )
 
 
@@ -300,32 +349,36 @@ class Trade(Base):
     """Завершённые сделки."""
     __tablename__ = "trades"
 
-    id = Column(Integer, primary_key=True)
-    instrument_id = Column(Integer, ForeignKey("instruments.id"), nullable=False)
-    signal_id = Column(Integer, ForeignKey("signals.id"))
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    instrument_id: Mapped[int] = mapped_column(Integer, ForeignKey("instruments.id", ondelete="CASCADE"), nullable=False)
+    signal_id: Mapped[Optional[int]] = mapped_column(Integer, ForeignKey("signals.id"))
 
     # Вход
-    entry_date = Column(Date, nullable=False)
-    entry_time = Column(DateTime)
-    entry_price = Column(Float, nullable=False)
-    entry_size = Column(Integer, nullable=False)
+    entry_date: Mapped[dt.date] = mapped_column(Date, nullable=False)
+    entry_time: Mapped[Optional[dt.datetime]] = mapped_column(DateTime)
+    entry_price: Mapped[float] = mapped_column(Float, nullable=False)
+    entry_size: Mapped[int] = mapped_column(Integer, nullable=False)
 
     # Выход
-    exit_date = Column(Date)
-    exit_time = Column(DateTime)
-    exit_price = Column(Float)
-    exit_reason = Column(String(50))  # take_profit, stop_loss, manual, timeout
+    exit_date: Mapped[Optional[dt.date]] = mapped_column(Date)
+    exit_time: Mapped[Optional[dt.datetime]] = mapped_column(DateTime)
+    exit_price: Mapped[Optional[float]] = mapped_column(Float)
+    exit_reason: Mapped[Optional[str]] = mapped_column(String(50))  # take_profit, stop_loss, manual, timeout
 
     # Результат
-    pnl_rub = Column(Float)
-    pnl_pct = Column(Float)
-    commission_rub = Column(Float, default=0)
+    pnl_rub: Mapped[Optional[float]] = mapped_column(Float)
+    pnl_pct: Mapped[Optional[float]] = mapped_column(Float)
+    commission_rub: Mapped[Optional[float]] = mapped_column(Float, default=0)
 
     # Метаданные
-    strategy = Column(String(50))
-    notes = Column(Text)
+    strategy: Mapped[Optional[str]] = mapped_column(String(50))
+    notes: Mapped[Optional[str]] = mapped_column(Text)
 
-    created_at = Column(DateTime, default=datetime.utcnow)
+    created_at: Mapped[Optional[dt.datetime]] = mapped_column(DateTime, server_default=UTC_NOW)
 
-    instrument = relationship("Instrument")
-    signal = relationship("Signal")
\ No newline at end of file
+    instrument: Mapped["Instrument"] = relationship("Instrument", lazy="raise")
+    signal: Mapped[Optional["Signal"]] = relationship("Signal", lazy="raise")
+
+    __table_args__ = (
+        Index("ix_trades_entry_time", "entry_time"),
+    )
\ No newline at end of file
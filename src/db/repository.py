@@ -1,28 +1,311 @@
 """Репозиторий для работы с БД."""
-from datetime import datetime, date, timedelta
-from typing import Optional, List, Dict, Any
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from datetime import datetime, date, time, timedelta
+from typing import AsyncIterator, Optional, List, Dict, Any, Tuple
 
-from sqlalchemy import select, and_, func
-from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
+from cachetools import TTLCache
+from sqlalchemy import (
+    DateTime, Float, Integer, Row, column, delete, select, text, update, values,
+    and_, func
+)
+from sqlalchemy.ext.asyncio import (
+    AsyncEngine, AsyncSession, create_async_engine, async_sessionmaker
+)
 from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import make_transient_to_detached, selectinload
 import structlog
 
 from db.models import (
-    Base, Instrument, IndicatorDaily, Signal, Trade,
+    Base, Instrument, CandleDaily, IndicatorDaily, Signal, Trade,
     BotSettings, TrackedOrderDB
 )
 
 logger = structlog.get_logger()
 
+# Кэш инструментов: FIGI/тикер не меняются в течение торговой сессии
+INSTRUMENT_CACHE_SIZE = 4096
+INSTRUMENT_CACHE_TTL = 300  # сек
+
+# Кэш BotSettings (singleton): читается на каждом тике watcher'а,
+# меняется редко; мутаторы репозитория обновляют кэш сами
+SETTINGS_CACHE_TTL = 5.0  # сек
+
+# Движки по URL: пул соединений один на процесс, сколько бы Repository
+# ни создавалось (тесты, CLI, воркеры)
+_ENGINES: Dict[str, AsyncEngine] = {}
+# Сколько открытых Repository держат движок URL (закрывает последний)
+_ENGINE_REFS: Dict[str, int] = {}
+
+# Открытые единицы работы (см. Repository.uow): пары (repo, session),
+# внутренняя — последней; пусто вне uow. Одна переменная на процесс —
+# ContextVar не удаляется, поэтому заводить её на каждый экземпляр нельзя
+_SESSION_CTX: ContextVar[Tuple[Tuple["Repository", AsyncSession], ...]] = ContextVar(
+    "repository_session", default=()
+)
+
+# Горячий поиск инструмента по FIGI — сырой SQL asyncpg без компиляции
+# SQLAlchemy; asyncpg держит prepared statement в кэше соединения
+_INSTRUMENT_BY_FIGI_SQL = "SELECT {} FROM instruments WHERE figi = $1".format(
+    ", ".join(c.name for c in Instrument.__table__.columns)
+)
+
+# Строк на одну выборку серверного курсора в iter_* методах
+STREAM_YIELD_PER = 200
+
+# Колонки tracked_orders, которые можно обновлять через update_tracked_order
+_TRACKED_ORDER_COLUMNS = frozenset(TrackedOrderDB.__table__.columns.keys()) - {"id", "order_id"}
+
+# Размер пачки для многострочных INSERT (лимит asyncpg — 32767 параметров)
+BULK_CHUNK_SIZE = 1000
+
+
+def _chunks(rows: List[Dict[str, Any]], size: int = BULK_CHUNK_SIZE):
+    """Режет список строк на пачки по size."""
+    for i in range(0, len(rows), size):
+        yield rows[i:i + size]
+
+
+def _day_range(day: date):
+    """Полуинтервал [начало дня, начало следующего дня) для фильтра по timestamp."""
+    start = datetime.combine(day, time.min)
+    return start, start + timedelta(days=1)
+
+
+def _indicator_row(instrument_id: int, calc_date: date, data: Dict[str, Any]) -> Dict[str, Any]:
+    """Приводит словарь индикаторов к колонкам IndicatorDaily."""
+    return {
+        "instrument_id": instrument_id,
+        "date": calc_date,
+        "close": data.get("close"),
+        "atr": data.get("atr"),
+        "atr_pct": data.get("atr_pct"),
+        "bb_upper": data.get("bb_upper"),
+        "bb_middle": data.get("bb_middle"),
+        "bb_lower": data.get("bb_lower"),
+        "distance_to_bb_lower_pct": data.get("distance_to_bb_pct"),
+        # EMA (13/26)
+        "ema_13": data.get("ema_13"),
+        "ema_26": data.get("ema_26"),
+        "ema_trend": data.get("ema_trend"),
+        "ema_diff_pct": data.get("ema_diff_pct"),
+        "ema_13_slope": data.get("ema_13_slope"),
+        "ema_26_slope": data.get("ema_26_slope"),
+        "distance_to_ema_13_pct": data.get("distance_to_ema_13_pct"),
+        "distance_to_ema_26_pct": data.get("distance_to_ema_26_pct"),
+        # Ликвидность
+        "volume_rub": data.get("volume_rub"),
+        "spread_pct": data.get("spread_pct"),
+    }
+
 
 class Repository:
     """Асинхронный репозиторий для работы с PostgreSQL."""
 
-    def __init__(self, database_url: str):
-        self.engine = create_async_engine(database_url, echo=False)
+    def __init__(
+        self,
+        database_url: str,
+        pool_size: int = 20,
+        max_overflow: int = 30,
+        pool_pre_ping: bool = True,
+        pool_recycle: int = 3600,
+        pool_timeout: int = 30,
+        statement_cache_size: int = 1024,
+        query_cache_size: int = 1200,
+    ):
+        """
+        Args:
+            database_url: postgresql+asyncpg://...
+            pool_size: Постоянных соединений в пуле (не меньше числа
+                параллельных запросов, запускаемых через asyncio.gather)
+            max_overflow: Дополнительных соединений сверх pool_size
+            pool_pre_ping: Проверять соединение перед выдачей из пула
+            pool_recycle: Пересоздавать соединения старше N секунд
+            pool_timeout: Сколько секунд ждать свободное соединение
+            statement_cache_size: Размер кэша подготовленных запросов asyncpg
+            query_cache_size: Размер LRU-кэша скомпилированных SQL SQLAlchemy
+
+        Экземпляры с одинаковым database_url делят один движок и пул;
+        параметры пула берутся у первого созданного.
+
+        Методы — тонкие обёртки над короткими запросами asyncpg, поэтому
+        накладные расходы цикла событий заметны: main.py ставит uvloop.
+        """
+        engine = _ENGINES.get(database_url)
+        if engine is None:
+            engine = _ENGINES[database_url] = self._create_engine(
+                database_url,
+                pool_size=pool_size,
+                max_overflow=max_overflow,
+                pool_pre_ping=pool_pre_ping,
+                pool_recycle=pool_recycle,
+                pool_timeout=pool_timeout,
+                statement_cache_size=statement_cache_size,
+                query_cache_size=query_cache_size,
+            )
+        _ENGINE_REFS[database_url] = _ENGINE_REFS.get(database_url, 0) + 1
+        self.database_url = database_url
+        self.engine = engine
         self.async_session = async_sessionmaker(
             self.engine, class_=AsyncSession, expire_on_commit=False
         )
+        # Кэш get_instrument_by_figi / get_instrument_by_ticker
+        self._figi_cache: TTLCache = TTLCache(
+            maxsize=INSTRUMENT_CACHE_SIZE, ttl=INSTRUMENT_CACHE_TTL
+        )
+        self._ticker_cache: TTLCache = TTLCache(
+            maxsize=INSTRUMENT_CACHE_SIZE, ttl=INSTRUMENT_CACHE_TTL
+        )
+
+        # Кэш настроек бота: 1 → BotSettings (get_bot_settings),
+        # "is_active" → bool (узкий путь is_bot_active)
+        self._settings_cache: TTLCache = TTLCache(maxsize=2, ttl=SETTINGS_CACHE_TTL)
+
+    @staticmethod
+    def _create_engine(
+        database_url: str,
+        pool_size: int,
+        max_overflow: int,
+        pool_pre_ping: bool,
+        pool_recycle: int,
+        pool_timeout: int,
+        statement_cache_size: int,
+        query_cache_size: int,
+    ) -> AsyncEngine:
+        """Создаёт AsyncEngine с настроенным пулом и кэшем запросов asyncpg."""
+        return create_async_engine(
+            database_url,
+            echo=False,
+            pool_size=pool_size,
+            max_overflow=max_overflow,
+            pool_pre_ping=pool_pre_ping,
+            pool_recycle=pool_recycle,
+            pool_timeout=pool_timeout,
+            # Скомпилированные SELECT/INSERT/UPDATE переиспользуются по ключу
+            # структуры запроса — компиляция SQL один раз на форму запроса
+            query_cache_size=query_cache_size,
+            connect_args={
+                # Запросы параметризованы (id/figi/date) — asyncpg
+                # переиспользует серверные prepared statements между вызовами
+                "statement_cache_size": statement_cache_size,
+                "prepared_statement_cache_size": statement_cache_size,
+                "server_settings": {"jit": "off", "application_name": "tbot"},
+            },
+        )
+
+    def _uow_session(self) -> Optional[AsyncSession]:
+        """Сессия uow этого репозитория в текущем контексте или None."""
+        for repo, session in reversed(_SESSION_CTX.get()):
+            if repo is self:
+                return session
+        return None
+
+    @asynccontextmanager
+    async def uow(self) -> AsyncIterator[AsyncSession]:
+        """
+        Единица работы: все вызовы репозитория внутри блока используют
+        одну сессию и одну транзакцию (один BEGIN/COMMIT на весь блок).
+
+        Пример:
+            async with repo.uow():
+                await repo.save_signal(...)
+                await repo.save_trade(...)
+                await repo.commit()   # промежуточная фиксация (опционально)
+
+        Вложенный uow переиспользует внешний. На выходе — COMMIT,
+        при исключении — ROLLBACK.
+        """
+        current = self._uow_session()
+        if current is not None:
+            yield current
+            return
+
+        async with self.async_session() as session:
+            # Методы репозитория делают flush вместо commit (см. _commit)
+            session.info["autocommit"] = False
+            token = _SESSION_CTX.set(_SESSION_CTX.get() + ((self, session),))
+            try:
+                yield session
+                await session.commit()
+            except BaseException:
+                await session.rollback()
+                raise
+            finally:
+                _SESSION_CTX.reset(token)
+
+    async def commit(self):
+        """
+        Фиксирует текущую транзакцию uow; следующая операция начнёт новую.
+        Вне uow — ничего не делает (методы коммитят сами).
+        """
+        session = self._uow_session()
+        if session is not None:
+            await session.commit()
+
+    async def rollback(self):
+        """Откатывает текущую транзакцию uow. Вне uow — ничего не делает."""
+        session = self._uow_session()
+        if session is not None:
+            await session.rollback()
+
+    @asynccontextmanager
+    async def _session(self) -> AsyncIterator[AsyncSession]:
+        """Сессия текущего uow или новая короткая сессия."""
+        session = self._uow_session()
+        if session is not None:
+            yield session
+            return
+
+        async with self.async_session() as session:
+            yield session
+
+    async def _read(self, stmt) -> List[Row]:
+        """
+        Чтение через Core: строки Row (доступ по атрибутам, как у модели),
+        без Session, identity map и autoflush. Соединение сразу
+        возвращается в пул. Внутри uow — соединение его сессии.
+        """
+        session = self._uow_session()
+        if session is not None:
+            conn = await session.connection()
+            return list((await conn.execute(stmt)).all())
+        async with self.engine.connect() as conn:
+            return list((await conn.execute(stmt)).all())
+
+    async def _stream(self, stmt) -> AsyncIterator[Any]:
+        """
+        Отдаёт ORM-объекты запроса по мере чтения серверного курсора
+        (пачками по STREAM_YIELD_PER) — память O(пачки), а не O(N).
+
+        Внутри uow курсор занимает сессию, пока итерация не закончена.
+        """
+        async with self._session() as session:
+            result = await session.stream_scalars(
+                stmt.execution_options(yield_per=STREAM_YIELD_PER)
+            )
+            async for obj in result:
+                yield obj
+
+    @asynccontextmanager
+    async def _transaction(self) -> AsyncIterator[AsyncSession]:
+        """
+        Сессия для записи: на выходе из блока — COMMIT (в uow — flush).
+        При исключении COMMIT не выполняется, короткая сессия
+        откатывается при закрытии.
+        """
+        async with self._session() as session:
+            yield session
+            await self._commit(session)
+
+    async def _commit(self, session: AsyncSession):
+        """
+        COMMIT для короткой сессии; в сессии uow (autocommit=False) —
+        только flush, коммит делает uow или явный repo.commit().
+        """
+        if session.info.get("autocommit", True):
+            await session.commit()
+        else:
+            await session.flush()
 
     async def init_db(self):
         """Создаёт таблицы если не существуют."""
@@ -31,46 +314,109 @@ class Repository:
         logger.info("database_initialized")
 
     async def close(self):
-        """Закрывает подключение."""
+        """
+        Закрывает подключение. Общий пул URL освобождается, когда
+        закрыт последний Repository, который его использует.
+        """
+        refs = _ENGINE_REFS.get(self.database_url, 0) - 1
+        if refs > 0:
+            _ENGINE_REFS[self.database_url] = refs
+            return
+        _ENGINE_REFS.pop(self.database_url, None)
+        if _ENGINES.get(self.database_url) is self.engine:
+            del _ENGINES[self.database_url]
         await self.engine.dispose()
 
     # ═══════════════════════════════════════════════════════════
     # Bot Settings (Kill Switch + Mode)
     # ═══════════════════════════════════════════════════════════
 
+    def invalidate_settings_cache(self):
+        """Сбрасывает кэш настроек (после изменения в обход репозитория)."""
+        self._settings_cache.clear()
+
+    def _cache_settings(self, session: AsyncSession, settings: BotSettings):
+        """
+        Кладёт настройки в кэш. Внутри uow только сбрасывает кэш:
+        транзакция ещё может откатиться.
+        """
+        if session.info.get("autocommit", True):
+            self._settings_cache.pop("is_active", None)
+            self._settings_cache[1] = settings
+        else:
+            self._settings_cache.clear()
+
     async def get_bot_settings(self) -> BotSettings:
         """
         Получает настройки бота (singleton, id=1).
         Создаёт запись если не существует.
+
+        Результат кэшируется на SETTINGS_CACHE_TTL секунд.
         """
-        async with self.async_session() as session:
+        settings = self._settings_cache.get(1)
+        if settings is not None:
+            return settings
+
+        async with self._transaction() as session:
             result = await session.execute(
                 select(BotSettings).where(BotSettings.id == 1)
             )
             settings = result.scalar_one_or_none()
             
             if not settings:
-                # Создаём с безопасными дефолтами
-                settings = BotSettings(
-                    id=1,
-                    is_active=False,  # Бот ВЫКЛЮЧЕН по умолчанию!
-                    mode="manual",
-                    last_change_reason="Initial setup",
-                    last_change_by="system",
-                    last_change_at=datetime.utcnow(),
+                # Создаём с безопасными дефолтами. INSERT ... RETURNING
+                # вместо add/refresh; DO NOTHING — если строку параллельно
+                # уже создал другой процесс, перечитываем её ниже.
+                result = await session.execute(
+                    insert(BotSettings).values(
+                        id=1,
+                        is_active=False,  # Бот ВЫКЛЮЧЕН по умолчанию!
+                        mode="manual",
+                        last_change_reason="Initial setup",
+                        last_change_by="system",
+                        last_change_at=datetime.utcnow(),
+                    )
+                    .on_conflict_do_nothing(index_elements=["id"])
+                    .returning(BotSettings)
                 )
-                session.add(settings)
-                await session.commit()
-                await session.refresh(settings)
-                logger.info("bot_settings_created", is_active=False, mode="manual")
-            
-            return settings
+                settings = result.scalar_one_or_none()
+                if settings is None:
+                    result = await session.execute(
+                        select(BotSettings).where(BotSettings.id == 1)
+                    )
+                    settings = result.scalar_one()
+                else:
+                    logger.info("bot_settings_created", is_active=False, mode="manual")
+        
+        self._cache_settings(session, settings)
+        return settings
 
     async def is_bot_active(self) -> bool:
-        """Проверяет активен ли бот (kill switch)."""
+        """
+        Проверяет активен ли бот (kill switch).
+
+        Горячий путь watcher'а: при промахе кэша читается одна колонка
+        (SELECT is_active ... WHERE id = 1), без ORM-объекта. Полный
+        get_bot_settings — только если строки ещё нет (первый запуск).
+        """
         try:
-            settings = await self.get_bot_settings()
-            return settings.is_active
+            settings = self._settings_cache.get(1)
+            if settings is not None:
+                return settings.is_active
+            is_active = self._settings_cache.get("is_active")
+            if is_active is not None:
+                return is_active
+
+            async with self._session() as session:
+                result = await session.execute(
+                    select(BotSettings.is_active).where(BotSettings.id == 1)
+                )
+                is_active = result.scalar_one_or_none()
+            if is_active is None:
+                settings = await self.get_bot_settings()
+                return settings.is_active
+            self._settings_cache["is_active"] = bool(is_active)
+            return bool(is_active)
         except Exception as e:
             logger.error("is_bot_active_error", error=str(e))
             return False  # При ошибке — безопасное состояние
@@ -84,6 +430,37 @@ class Repository:
             logger.error("get_bot_mode_error", error=str(e))
             return "manual"  # При ошибке — безопасный режим
 
+    async def _upsert_bot_settings(
+        self,
+        reason: str,
+        changed_by: str,
+        **fields
+    ) -> BotSettings:
+        """
+        Записывает поля строки id=1 одним INSERT ... ON CONFLICT DO UPDATE
+        ... RETURNING (вместо SELECT + изменение + COMMIT + refresh).
+        Если строки нет — создаётся с дефолтами модели.
+
+        Поля аудита (причина, автор, время) заполняются здесь:
+        одно обращение к часам на вызов, срезы строк — только непустых.
+        """
+        now = datetime.utcnow()
+        fields["last_change_reason"] = reason[:200] if reason else ""
+        fields["last_change_by"] = str(changed_by)[:50] if changed_by else ""
+        fields["last_change_at"] = now
+        fields["updated_at"] = now
+        async with self._transaction() as session:
+            result = await session.execute(
+                insert(BotSettings)
+                .values(id=1, **fields)
+                .on_conflict_do_update(index_elements=["id"], set_=fields)
+                .returning(BotSettings)
+                .execution_options(populate_existing=True)
+            )
+            settings = result.scalar_one()
+        self._cache_settings(session, settings)
+        return settings
+
     async def set_bot_active(
         self,
         is_active: bool,
@@ -98,29 +475,14 @@ class Repository:
             reason: Причина изменения (для аудита)
             changed_by: Кто изменил (telegram user_id / system)
         """
-        async with self.async_session() as session:
-            result = await session.execute(
-                select(BotSettings).where(BotSettings.id == 1)
-            )
-            settings = result.scalar_one_or_none()
-            
-            if not settings:
-                settings = BotSettings(id=1)
-                session.add(settings)
-            
-            settings.is_active = is_active
-            settings.last_change_reason = reason[:200] if reason else ""
-            settings.last_change_by = str(changed_by)[:50]
-            settings.last_change_at = datetime.utcnow()
-            
-            await session.commit()
-            await session.refresh(settings)
-            
-            logger.info("bot_active_changed",
-                       is_active=is_active,
-                       reason=reason,
-                       by=changed_by)
-            return settings
+        settings = await self._upsert_bot_settings(
+            reason, changed_by, is_active=is_active
+        )
+        logger.info("bot_active_changed",
+                   is_active=is_active,
+                   reason=reason,
+                   by=changed_by)
+        return settings
 
     async def set_bot_mode(
         self,
@@ -143,29 +505,12 @@ class Repository:
         if mode not in valid_modes:
             raise ValueError(f"Invalid mode: {mode}. Valid: {valid_modes}")
         
-        async with self.async_session() as session:
-            result = await session.execute(
-                select(BotSettings).where(BotSettings.id == 1)
-            )
-            settings = result.scalar_one_or_none()
-            
-            if not settings:
-                settings = BotSettings(id=1)
-                session.add(settings)
-            
-            settings.mode = mode
-            settings.last_change_reason = reason[:200] if reason else ""
-            settings.last_change_by = str(changed_by)[:50]
-            settings.last_change_at = datetime.utcnow()
-            
-            await session.commit()
-            await session.refresh(settings)
-            
-            logger.info("bot_mode_changed",
-                       mode=mode,
-                       reason=reason,
-                       by=changed_by)
-            return settings
+        settings = await self._upsert_bot_settings(reason, changed_by, mode=mode)
+        logger.info("bot_mode_changed",
+                   mode=mode,
+                   reason=reason,
+                   by=changed_by)
+        return settings
 
     async def pause_bot_until(
         self,
@@ -174,27 +519,14 @@ class Repository:
         changed_by: str = "system"
     ) -> BotSettings:
         """Приостанавливает бота до указанного времени."""
-        async with self.async_session() as session:
-            result = await session.execute(
-                select(BotSettings).where(BotSettings.id == 1)
-            )
-            settings = result.scalar_one_or_none()
-            
-            if not settings:
-                settings = BotSettings(id=1)
-                session.add(settings)
-            
-            settings.is_active = False
-            settings.pause_until = until
-            settings.last_change_reason = reason[:200] if reason else f"Paused until {until}"
-            settings.last_change_by = str(changed_by)[:50]
-            settings.last_change_at = datetime.utcnow()
-            
-            await session.commit()
-            await session.refresh(settings)
-            
-            logger.info("bot_paused_until", until=until.isoformat(), by=changed_by)
-            return settings
+        settings = await self._upsert_bot_settings(
+            reason or f"Paused until {until}",
+            changed_by,
+            is_active=False,
+            paused_until=until,
+        )
+        logger.info("bot_paused_until", until=until.isoformat(), by=changed_by)
+        return settings
 
     async def increment_bot_stats(
         self,
@@ -212,35 +544,70 @@ class Repository:
             tp_triggered: Добавить к счётчику сработавших TP
             pnl_rub: Добавить к общему PnL
         """
-        async with self.async_session() as session:
-            result = await session.execute(
-                select(BotSettings).where(BotSettings.id == 1)
+        deltas = {
+            "total_orders_placed": orders,
+            "total_sl_triggered": sl_triggered,
+            "total_tp_triggered": tp_triggered,
+            "total_pnl_rub": pnl_rub,
+        }
+        deltas = {k: v for k, v in deltas.items() if v}
+        if not deltas:
+            return
+
+        # Арифметика в БД: один upsert, без гонки read-modify-write.
+        # Если строки id=1 ещё нет — создаётся с дефолтами и дельтами.
+        table = BotSettings.__table__
+        async with self._transaction() as session:
+            await session.execute(
+                insert(BotSettings)
+                .values(id=1, **deltas)
+                .on_conflict_do_update(
+                    index_elements=["id"],
+                    set_={
+                        k: func.coalesce(table.c[k], 0) + v
+                        for k, v in deltas.items()
+                    },
+                )
             )
-            settings = result.scalar_one_or_none()
-            
-            if settings:
-                if orders:
-                    settings.total_orders = (settings.total_orders or 0) + orders
-                if sl_triggered:
-                    settings.total_sl_triggered = (settings.total_sl_triggered or 0) + sl_triggered
-                if tp_triggered:
-                    settings.total_tp_triggered = (settings.total_tp_triggered or 0) + tp_triggered
-                if pnl_rub:
-                    settings.total_pnl_rub = (settings.total_pnl_rub or 0) + pnl_rub
-                
-                await session.commit()
-                logger.debug("bot_stats_updated",
-                           orders=orders,
-                           sl=sl_triggered,
-                           tp=tp_triggered,
-                           pnl=pnl_rub)
+        self.invalidate_settings_cache()
+        logger.debug("bot_stats_updated",
+                   orders=orders,
+                   sl=sl_triggered,
+                   tp=tp_triggered,
+                   pnl=pnl_rub)
 
     async def get_bot_stats(self) -> Dict[str, Any]:
-        """Возвращает статистику бота."""
-        settings = await self.get_bot_settings()
+        """
+        Возвращает статистику бота.
+
+        Из кэша настроек, если строка там есть; иначе — узкий SELECT
+        счётчиков, win_rate считается в SQL (NULLIF от деления на ноль).
+        """
+        settings = self._settings_cache.get(1)
+        if settings is None:
+            sl = func.coalesce(BotSettings.total_sl_triggered, 0)
+            tp = func.coalesce(BotSettings.total_tp_triggered, 0)
+            rows = await self._read(
+                select(
+                    func.coalesce(BotSettings.total_orders_placed, 0).label("total_orders"),
+                    sl.label("total_sl_triggered"),
+                    tp.label("total_tp_triggered"),
+                    func.coalesce(BotSettings.total_pnl_rub, 0).label("total_pnl_rub"),
+                    func.coalesce(
+                        tp * 100.0 / func.nullif(sl + tp, 0), 0
+                    ).label("win_rate"),
+                )
+                .where(BotSettings.id == 1)
+            )
+            if rows:
+                stats = dict(rows[0]._mapping)
+                stats["win_rate"] = float(stats["win_rate"])
+                return stats
+            settings = await self.get_bot_settings()
+
         total_trades = (settings.total_sl_triggered or 0) + (settings.total_tp_triggered or 0)
         return {
-            "total_orders": settings.total_orders or 0,
+            "total_orders": settings.total_orders_placed or 0,
             "total_sl_triggered": settings.total_sl_triggered or 0,
             "total_tp_triggered": settings.total_tp_triggered or 0,
             "total_pnl_rub": settings.total_pnl_rub or 0,
@@ -262,21 +629,41 @@ class Repository:
         Args:
             data: Словарь с полями TrackedOrderDB
         """
-        async with self.async_session() as session:
-            order = TrackedOrderDB(**data)
-            session.add(order)
-            await session.commit()
-            await session.refresh(order)
-            
-            logger.info("tracked_order_saved",
-                       order_id=order.order_id,
-                       ticker=order.ticker,
-                       order_type=order.order_type)
-            return order
+        async with self._transaction() as session:
+            # INSERT ... RETURNING: строка с id и дефолтами за один запрос,
+            # без add/commit/refresh
+            result = await session.execute(
+                insert(TrackedOrderDB).values(**data).returning(TrackedOrderDB)
+            )
+            order = result.scalar_one()
+
+        logger.info("tracked_order_saved",
+                   order_id=order.order_id,
+                   ticker=order.ticker,
+                   order_type=order.order_type)
+        return order
+
+    async def save_tracked_orders(self, rows: List[Dict[str, Any]]) -> int:
+        """
+        Сохраняет пачку заявок — один многострочный INSERT на пачку.
+        
+        Args:
+            rows: Словари с полями TrackedOrderDB (одинаковый набор ключей)
+        
+        Returns:
+            Количество сохранённых заявок
+        """
+        if not rows:
+            return 0
+        async with self._transaction() as session:
+            for chunk in _chunks(rows):
+                await session.execute(insert(TrackedOrderDB).values(chunk))
+        logger.info("tracked_orders_saved", count=len(rows))
+        return len(rows)
 
     async def get_tracked_order(self, order_id: str) -> Optional[TrackedOrderDB]:
         """Получает заявку по order_id."""
-        async with self.async_session() as session:
+        async with self._session() as session:
             result = await session.execute(
                 select(TrackedOrderDB).where(TrackedOrderDB.order_id == order_id)
             )
@@ -287,7 +674,7 @@ class Repository:
         Получает все pending заявки.
         Используется при старте бота для восстановления состояния.
         """
-        async with self.async_session() as session:
+        async with self._session() as session:
             result = await session.execute(
                 select(TrackedOrderDB)
                 .where(TrackedOrderDB.status == "pending")
@@ -297,25 +684,32 @@ class Repository:
             logger.info("pending_orders_fetched", count=len(orders))
             return orders
 
-    async def get_orders_by_ticker(self, ticker: str) -> List[TrackedOrderDB]:
-        """Получает все заявки по тикеру."""
-        async with self.async_session() as session:
-            result = await session.execute(
-                select(TrackedOrderDB)
-                .where(TrackedOrderDB.ticker == ticker)
-                .order_by(TrackedOrderDB.created_at.desc())
-            )
-            return list(result.scalars().all())
+    def iter_pending_orders(self) -> AsyncIterator[TrackedOrderDB]:
+        """Pending заявки потоком (async for), без загрузки всего списка."""
+        return self._stream(
+            select(TrackedOrderDB)
+            .where(TrackedOrderDB.status == "pending")
+            .order_by(TrackedOrderDB.created_at)
+        )
 
-    async def get_orders_by_status(self, status: str) -> List[TrackedOrderDB]:
-        """Получает заявки по статусу: pending / executed / cancelled."""
-        async with self.async_session() as session:
-            result = await session.execute(
-                select(TrackedOrderDB)
-                .where(TrackedOrderDB.status == status)
-                .order_by(TrackedOrderDB.created_at.desc())
-            )
-            return list(result.scalars().all())
+    async def get_orders_by_ticker(self, ticker: str) -> List[Row]:
+        """Получает все заявки по тикеру (Row с колонками tracked_orders)."""
+        return await self._read(
+            select(TrackedOrderDB)
+            .where(TrackedOrderDB.ticker == ticker)
+            .order_by(TrackedOrderDB.created_at.desc())
+        )
+
+    async def get_orders_by_status(self, status: str) -> List[Row]:
+        """
+        Получает заявки по статусу: pending / executed / cancelled
+        (Row с колонками tracked_orders).
+        """
+        return await self._read(
+            select(TrackedOrderDB)
+            .where(TrackedOrderDB.status == status)
+            .order_by(TrackedOrderDB.created_at.desc())
+        )
 
     async def update_tracked_order(self, order_id: str, data: Dict[str, Any]) -> bool:
         """
@@ -328,23 +722,22 @@ class Repository:
         Returns:
             True если заявка найдена и обновлена
         """
-        async with self.async_session() as session:
+        # Только колонки таблицы: лишние ключи (is_executed, cancel_reason)
+        # молча пропускаются, как раньше через hasattr
+        values = {k: v for k, v in data.items() if k in _TRACKED_ORDER_COLUMNS}
+        values["updated_at"] = datetime.utcnow()
+        
+        async with self._transaction() as session:
             result = await session.execute(
-                select(TrackedOrderDB).where(TrackedOrderDB.order_id == order_id)
+                update(TrackedOrderDB)
+                .where(TrackedOrderDB.order_id == order_id)
+                .values(**values)
+                .execution_options(synchronize_session=False)
             )
-            order = result.scalar_one_or_none()
-            
-            if not order:
+            if result.rowcount == 0:
                 logger.warning("update_tracked_order_not_found", order_id=order_id)
                 return False
             
-            for key, value in data.items():
-                if hasattr(order, key):
-                    setattr(order, key, value)
-            
-            order.updated_at = datetime.utcnow()
-            await session.commit()
-            
             logger.debug("tracked_order_updated", order_id=order_id, fields=list(data.keys()))
             return True
 
@@ -389,6 +782,9 @@ class Repository:
         """
         Связывает entry заявку с SL и TP.
         
+        Если переданы обе, SL и TP получают и ссылки друг на друга —
+        после рестарта парная заявка находится по своей строке.
+        
         Args:
             entry_order_id: ID entry заявки
             sl_order_id: ID стоп-лосс заявки
@@ -400,48 +796,51 @@ class Repository:
         if tp_order_id:
             data["tp_order_id"] = tp_order_id
         
-        if data:
-            return await self.update_tracked_order(entry_order_id, data)
-        return False
+        if not data:
+            return False
+        async with self.uow():
+            linked = await self.update_tracked_order(entry_order_id, data)
+            if sl_order_id and tp_order_id:
+                await self.update_tracked_order(sl_order_id, {"tp_order_id": tp_order_id})
+                await self.update_tracked_order(tp_order_id, {"sl_order_id": sl_order_id})
+        return linked
 
     async def get_order_stats(self) -> Dict[str, Any]:
-        """Возвращает статистику по заявкам."""
-        async with self.async_session() as session:
-            # Подсчёт по статусам
+        """
+        Возвращает статистику по заявкам.
+
+        Один запрос GROUP BY (status, order_type): разрезы по статусу,
+        по типу и PnL исполненных собираются из его строк.
+        """
+        async with self._session() as session:
             result = await session.execute(
                 select(
                     TrackedOrderDB.status,
-                    func.count(TrackedOrderDB.id).label("count")
-                )
-                .group_by(TrackedOrderDB.status)
-            )
-            status_counts = {row.status: row.count for row in result}
-            
-            # Подсчёт по типам
-            result = await session.execute(
-                select(
                     TrackedOrderDB.order_type,
-                    func.count(TrackedOrderDB.id).label("count")
+                    func.count(TrackedOrderDB.id).label("count"),
+                    func.sum(TrackedOrderDB.pnl_rub).label("pnl"),
                 )
-                .group_by(TrackedOrderDB.order_type)
+                .group_by(TrackedOrderDB.status, TrackedOrderDB.order_type)
             )
-            type_counts = {row.order_type: row.count for row in result}
-            
-            # Общий PnL
-            result = await session.execute(
-                select(func.sum(TrackedOrderDB.pnl_rub))
-                .where(TrackedOrderDB.status == "executed")
-            )
-            total_pnl = result.scalar() or 0
-            
-            return {
-                "by_status": status_counts,
-                "by_type": type_counts,
-                "total_pnl_rub": total_pnl,
-                "pending": status_counts.get("pending", 0),
-                "executed": status_counts.get("executed", 0),
-                "cancelled": status_counts.get("cancelled", 0),
-            }
+            rows = result.all()
+
+        status_counts: Dict[str, int] = {}
+        type_counts: Dict[str, int] = {}
+        total_pnl = 0
+        for row in rows:
+            status_counts[row.status] = status_counts.get(row.status, 0) + row.count
+            type_counts[row.order_type] = type_counts.get(row.order_type, 0) + row.count
+            if row.status == "executed" and row.pnl is not None:
+                total_pnl += row.pnl
+
+        return {
+            "by_status": status_counts,
+            "by_type": type_counts,
+            "total_pnl_rub": total_pnl,
+            "pending": status_counts.get("pending", 0),
+            "executed": status_counts.get("executed", 0),
+            "cancelled": status_counts.get("cancelled", 0),
+        }
 
     async def cleanup_old_orders(self, days: int = 30) -> int:
         """
@@ -453,26 +852,21 @@ class Repository:
         Returns:
             Количество удалённых записей
         """
-        async with self.async_session() as session:
-            cutoff = datetime.utcnow() - timedelta(days=days)
-            
+        cutoff = datetime.utcnow() - timedelta(days=days)
+        async with self._transaction() as session:
+            # Один DELETE на сервере — строки не загружаются в сессию
             result = await session.execute(
-                select(TrackedOrderDB)
+                delete(TrackedOrderDB)
                 .where(
                     and_(
                         TrackedOrderDB.status.in_(["executed", "cancelled"]),
                         TrackedOrderDB.updated_at < cutoff
                     )
                 )
+                .execution_options(synchronize_session=False)
             )
-            orders = result.scalars().all()
+            count = result.rowcount
             
-            count = 0
-            for order in orders:
-                await session.delete(order)
-                count += 1
-            
-            await session.commit()
             logger.info("old_orders_cleaned", count=count, days=days)
             return count
 
@@ -482,38 +876,142 @@ class Repository:
 
     async def upsert_instrument(self, data: Dict[str, Any]) -> Instrument:
         """Создаёт или обновляет инструмент."""
-        async with self.async_session() as session:
+        async with self._transaction() as session:
             stmt = insert(Instrument).values(**data)
             stmt = stmt.on_conflict_do_update(
                 index_elements=["figi"],
                 set_={k: v for k, v in data.items() if k != "figi"}
-            )
-            await session.execute(stmt)
-            await session.commit()
+            ).returning(Instrument)
+            # populate_existing: внутри uow строка может уже быть в identity map
             result = await session.execute(
-                select(Instrument).where(Instrument.figi == data["figi"])
+                stmt, execution_options={"populate_existing": True}
             )
-            return result.scalar_one()
+            instrument = result.scalar_one()
+        self._invalidate_instrument(data["figi"], data.get("ticker"))
+        self._cache_instrument(session, instrument)
+        return instrument
+
+    async def upsert_instruments_bulk(
+        self,
+        rows: List[Dict[str, Any]],
+        update_columns: Optional[Tuple[str, ...]] = None,
+    ) -> Dict[str, int]:
+        """
+        Создаёт или обновляет пачку инструментов одной транзакцией.
+
+        Все строки должны иметь одинаковый набор ключей, figi — ключ
+        конфликта. Дубли figi схлопываются (остаётся последняя строка).
+
+        Args:
+            rows: Словари с полями Instrument
+            update_columns: Какие колонки перезаписывать у существующих
+                инструментов (через EXCLUDED). None — все переданные,
+                () — только создать недостающие, существующие не трогать
+
+        Returns:
+            Словарь figi → id (и для новых, и для существующих)
+        """
+        if not rows:
+            return {}
+        # Дубли figi в одном INSERT ... ON CONFLICT DO UPDATE — ошибка PostgreSQL
+        rows = list({r["figi"]: r for r in rows}.values())
+        if update_columns is None:
+            update_columns = tuple(k for k in rows[0] if k != "figi")
+        # Пустой SET недопустим: figi = EXCLUDED.figi ничего не меняет,
+        # но RETURNING отдаёт id и для уже существующих строк
+        update_cols = update_columns or ("figi",)
+        ids: Dict[str, int] = {}
+        async with self._transaction() as session:
+            for chunk in _chunks(rows):
+                stmt = insert(Instrument).values(chunk)
+                stmt = stmt.on_conflict_do_update(
+                    index_elements=["figi"],
+                    set_={k: stmt.excluded[k] for k in update_cols}
+                ).returning(Instrument.figi, Instrument.id)
+                result = await session.execute(stmt)
+                ids.update({row.figi: row.id for row in result})
+        for row in rows:
+            self._invalidate_instrument(row["figi"], row.get("ticker"))
+        logger.info("instruments_upserted", count=len(ids))
+        return ids
+
+    def _invalidate_instrument(self, figi: str, ticker: Optional[str] = None):
+        """Сбрасывает кэш инструмента по FIGI (и тикеру)."""
+        cached = self._figi_cache.pop(figi, None)
+        if cached is not None:
+            self._ticker_cache.pop(cached.ticker, None)
+        if ticker:
+            self._ticker_cache.pop(ticker, None)
+
+    def _cache_instrument(self, session: AsyncSession, instrument: Instrument):
+        """
+        Write-through: кладёт сохранённый инструмент в кэши по FIGI и тикеру.
+        Внутри uow не кэширует — транзакция ещё может откатиться.
+        """
+        if session.info.get("autocommit", True):
+            self._figi_cache[instrument.figi] = instrument
+            self._ticker_cache[instrument.ticker] = instrument
 
     async def get_instrument_by_figi(self, figi: str) -> Optional[Instrument]:
-        """Получает инструмент по FIGI."""
-        async with self.async_session() as session:
+        """Получает инструмент по FIGI (с TTL-кэшем)."""
+        instrument = self._figi_cache.get(figi)
+        if instrument is not None:
+            return instrument
+
+        async with self._session() as session:
+            # Соединение сессии: внутри uow видны незакоммиченные изменения
+            conn = await session.connection()
+            raw = await conn.get_raw_connection()
+            row = await raw.driver_connection.fetchrow(_INSTRUMENT_BY_FIGI_SQL, figi)
+
+        if row is None:
+            return None
+        # Объект в состоянии detached с ключом идентичности — как
+        # экземпляр из закрытой сессии (session.add не сделает INSERT)
+        instrument = Instrument(**dict(row))
+        make_transient_to_detached(instrument)
+        self._figi_cache[figi] = instrument
+        return instrument
+
+    async def get_instruments_by_figis(self, figis: List[str]) -> Dict[str, Instrument]:
+        """
+        Получает инструменты по списку FIGI одним запросом (WHERE figi IN ...).
+
+        Предпочтительнее, чем N вызовов get_instrument_by_figi. Если нужны
+        независимые чтения, которые не сводятся к одному запросу, их можно
+        запускать через asyncio.gather — параллелизм ограничен
+        pool_size + max_overflow движка.
+
+        Returns:
+            Словарь figi → Instrument (отсутствующие FIGI не попадают)
+        """
+        if not figis:
+            return {}
+        async with self._session() as session:
             result = await session.execute(
-                select(Instrument).where(Instrument.figi == figi)
+                select(Instrument).where(Instrument.figi.in_(figis))
             )
-            return result.scalar_one_or_none()
+            return {inst.figi: inst for inst in result.scalars()}
 
     async def get_instrument_by_ticker(self, ticker: str) -> Optional[Instrument]:
-        """Получает инструмент по тикеру."""
-        async with self.async_session() as session:
+        """Получает инструмент по тикеру (с TTL-кэшем)."""
+        instrument = self._ticker_cache.get(ticker)
+        if instrument is not None:
+            return instrument
+
+        async with self._session() as session:
             result = await session.execute(
                 select(Instrument).where(Instrument.ticker == ticker)
             )
-            return result.scalar_one_or_none()
+            instrument = result.scalar_one_or_none()
+
+        if instrument is not None:
+            self._ticker_cache[ticker] = instrument
+        return instrument
 
     async def get_liquid_instruments(self) -> List[Instrument]:
         """Получает все ликвидные инструменты."""
-        async with self.async_session() as session:
+        async with self._session() as session:
             result = await session.execute(
                 select(Instrument)
                 .where(Instrument.is_liquid == True)
@@ -521,6 +1019,49 @@ class Repository:
             )
             return list(result.scalars().all())
 
+    async def get_liquid_instruments_lite(self) -> List[Row]:
+        """
+        Ликвидные инструменты без ORM-гидрации — только нужные колонки.
+
+        Возвращает Row (figi, ticker, lot_size, avg_volume_rub): без identity
+        map и инструментирования атрибутов. Для сканера, которому не нужен
+        полный Instrument; полная версия — get_liquid_instruments().
+        """
+        async with self._session() as session:
+            result = await session.execute(
+                select(
+                    Instrument.figi,
+                    Instrument.ticker,
+                    Instrument.lot_size,
+                    Instrument.avg_volume_rub,
+                )
+                .where(Instrument.is_liquid.is_(True))
+                .order_by(Instrument.avg_volume_rub.desc())
+            )
+            return list(result.all())
+
+    # ═══════════════════════════════════════════════════════════
+    # Свечи
+    # ═══════════════════════════════════════════════════════════
+
+    async def save_candles_daily(self, rows: List[Dict[str, Any]]) -> int:
+        """
+        Сохраняет пачку дневных свечей одним запросом.
+        Уже существующие (instrument_id, date) пропускаются.
+
+        Args:
+            rows: Список словарей с полями CandleDaily
+
+        Returns:
+            Количество переданных строк
+        """
+        if not rows:
+            return 0
+        async with self._transaction() as session:
+            await CandleDaily.bulk_upsert(session, rows)
+        logger.info("candles_saved", count=len(rows))
+        return len(rows)
+
     # ═══════════════════════════════════════════════════════════
     # Индикаторы
     # ═══════════════════════════════════════════════════════════
@@ -538,87 +1079,173 @@ class Repository:
             instrument_id: ID инструмента
             calc_date: Дата расчёта
             data: Словарь с индикаторами
+        
+        Returns:
+            Сохранённая строка (из RETURNING, без повторного SELECT)
         """
-        async with self.async_session() as session:
-            # Формируем данные для вставки
-            indicator_data = {
-                "instrument_id": instrument_id,
-                "date": calc_date,
-                "close": data.get("close"),
-                "atr": data.get("atr"),
-                "atr_pct": data.get("atr_pct"),
-                "bb_upper": data.get("bb_upper"),
-                "bb_middle": data.get("bb_middle"),
-                "bb_lower": data.get("bb_lower"),
-                "distance_to_bb_lower_pct": data.get("distance_to_bb_pct"),
-                # EMA (13/26)
-                "ema_13": data.get("ema_13"),
-                "ema_26": data.get("ema_26"),
-                "ema_trend": data.get("ema_trend"),
-                "ema_diff_pct": data.get("ema_diff_pct"),
-                "ema_13_slope": data.get("ema_13_slope"),
-                "ema_26_slope": data.get("ema_26_slope"),
-                "distance_to_ema_13_pct": data.get("distance_to_ema_13_pct"),
-                "distance_to_ema_26_pct": data.get("distance_to_ema_26_pct"),
-                # Ликвидность
-                "volume_rub": data.get("volume_rub"),
-                "spread_pct": data.get("spread_pct"),
-            }
+        async with self._transaction() as session:
+            indicator_data = _indicator_row(instrument_id, calc_date, data)
             
-            # Upsert: вставка или обновление по (instrument_id, date)
+            # Upsert: вставка или обновление по (instrument_id, date).
+            # RETURNING отдаёт сохранённую строку тем же запросом.
             stmt = insert(IndicatorDaily).values(**indicator_data)
             stmt = stmt.on_conflict_do_update(
                 constraint="uq_indicator_instrument_date",
                 set_={k: v for k, v in indicator_data.items()
                       if k not in ("instrument_id", "date")}
-            )
-            await session.execute(stmt)
-            await session.commit()
-            
-            # Возвращаем сохранённую запись
-            result = await session.execute(
-                select(IndicatorDaily).where(
-                    and_(
-                        IndicatorDaily.instrument_id == instrument_id,
-                        IndicatorDaily.date == calc_date
-                    )
-                )
-            )
+            ).returning(IndicatorDaily)
+            result = await session.execute(stmt)
             indicator = result.scalar_one()
             
-            logger.info("indicator_saved",
-                       instrument_id=instrument_id,
-                       date=str(calc_date),
-                       ema_13=data.get("ema_13"),
-                       ema_26=data.get("ema_26"),
-                       ema_trend=data.get("ema_trend"))
+            # Событие на каждую строку — debug; итоги пачек остаются в info
+            logger.debug("indicator_saved",
+                        instrument_id=instrument_id,
+                        date=calc_date,
+                        ema_trend=data.get("ema_trend"))
             
             return indicator
 
-    async def get_indicators_by_date(self, calc_date: date) -> List[IndicatorDaily]:
-        """Получает все индикаторы за дату."""
-        async with self.async_session() as session:
-            result = await session.execute(
-                select(IndicatorDaily)
-                .where(IndicatorDaily.date == calc_date)
-                .order_by(IndicatorDaily.instrument_id)
+    async def save_indicators_bulk(
+        self,
+        rows: List[Dict[str, Any]],
+        overwrite: bool = True
+    ) -> int:
+        """
+        Сохраняет или обновляет индикаторы пачкой — один upsert на пачку.
+
+        Args:
+            rows: Словари с instrument_id, date и индикаторами
+                  (те же ключи, что data в save_indicator_daily)
+            overwrite: False — ON CONFLICT DO NOTHING: уже посчитанные
+                  (instrument_id, date) не перезаписываются
+
+        Returns:
+            Количество переданных строк (после схлопывания дублей)
+        """
+        if not rows:
+            return 0
+        # Дубли ключа в одном INSERT ... ON CONFLICT DO UPDATE — ошибка
+        # PostgreSQL; оставляем последнюю строку для (instrument_id, date)
+        unique = {
+            (r["instrument_id"], r["date"]): _indicator_row(r["instrument_id"], r["date"], r)
+            for r in rows
+        }
+        rows = list(unique.values())
+        update_cols = [k for k in rows[0] if k not in ("instrument_id", "date")]
+        async with self._transaction() as session:
+            for chunk in _chunks(rows):
+                stmt = insert(IndicatorDaily).values(chunk)
+                if overwrite:
+                    stmt = stmt.on_conflict_do_update(
+                        constraint="uq_indicator_instrument_date",
+                        set_={k: stmt.excluded[k] for k in update_cols}
+                    )
+                else:
+                    stmt = stmt.on_conflict_do_nothing(
+                        constraint="uq_indicator_instrument_date"
+                    )
+                await session.execute(stmt)
+        logger.info("indicators_saved_bulk", count=len(rows), overwrite=overwrite)
+        return len(rows)
+
+    async def copy_indicators(self, rows: List[Dict[str, Any]]) -> int:
+        """
+        Массовая загрузка индикаторов через COPY (полный пересчёт за день).
+
+        Строки копируются бинарным COPY asyncpg во временную таблицу,
+        затем одним INSERT ... SELECT ... ON CONFLICT DO UPDATE переносятся
+        в indicators_daily. Для сотен строк и больше заметно быстрее
+        многострочного INSERT; для малых пачек — save_indicators_bulk.
+
+        Args:
+            rows: Словари с instrument_id, date и индикаторами
+                  (те же ключи, что data в save_indicator_daily)
+
+        Returns:
+            Количество загруженных строк (после схлопывания дублей)
+        """
+        if not rows:
+            return 0
+        # Как в save_indicators_bulk: дубли ключа в одном ON CONFLICT DO UPDATE
+        # — ошибка PostgreSQL; оставляем последнюю строку для (instrument_id, date)
+        unique = {
+            (r["instrument_id"], r["date"]): _indicator_row(r["instrument_id"], r["date"], r)
+            for r in rows
+        }
+        now = datetime.utcnow()
+        columns = list(next(iter(unique.values()))) + ["created_at"]
+        records = [tuple(r.values()) + (now,) for r in unique.values()]
+        update_cols = [c for c in columns if c not in ("instrument_id", "date", "created_at")]
+
+        cols_sql = ", ".join(columns)
+        set_sql = ", ".join(f"{c} = EXCLUDED.{c}" for c in update_cols)
+
+        async with self._transaction() as session:
+            conn = await session.connection()
+            # Только нужные колонки, без id и DEFAULT — COPY не тратит
+            # значения последовательности indicators_daily.id
+            await conn.execute(text(
+                "CREATE TEMP TABLE indicators_daily_stage ON COMMIT DROP AS "
+                f"SELECT {cols_sql} FROM indicators_daily WITH NO DATA"
+            ))
+            raw = await conn.get_raw_connection()
+            await raw.driver_connection.copy_records_to_table(
+                "indicators_daily_stage", records=records, columns=columns
             )
-            return list(result.scalars().all())
+            await conn.execute(text(
+                f"INSERT INTO indicators_daily ({cols_sql}) "
+                f"SELECT {cols_sql} FROM indicators_daily_stage "
+                f"ON CONFLICT ON CONSTRAINT uq_indicator_instrument_date "
+                f"DO UPDATE SET {set_sql}"
+            ))
+            # Внутри uow транзакция продолжается — освобождаем имя сразу
+            await conn.execute(text("DROP TABLE indicators_daily_stage"))
+        logger.info("indicators_copied", count=len(records))
+        return len(records)
+
+    async def get_indicators_by_date(self, calc_date: date) -> List[Row]:
+        """Получает все индикаторы за дату (Row с колонками indicators_daily)."""
+        return await self._read(
+            select(IndicatorDaily)
+            .where(IndicatorDaily.date == calc_date)
+            .order_by(IndicatorDaily.instrument_id)
+        )
+
+    def iter_indicators_by_date(self, calc_date: date) -> AsyncIterator[IndicatorDaily]:
+        """Индикаторы за дату потоком (async for), без загрузки всего списка."""
+        return self._stream(
+            select(IndicatorDaily)
+            .where(IndicatorDaily.date == calc_date)
+            .order_by(IndicatorDaily.instrument_id)
+        )
+
+    async def get_latest_indicator(self, instrument_id: int) -> Optional[Row]:
+        """
+        Последние индикаторы инструмента (Row с колонками indicators_daily).
+
+        WHERE instrument_id = ? ORDER BY date DESC LIMIT 1 — одно чтение
+        индекса (instrument_id, date) в обратном порядке, без сортировки.
+        """
+        rows = await self._read(
+            select(IndicatorDaily)
+            .where(IndicatorDaily.instrument_id == instrument_id)
+            .order_by(IndicatorDaily.date.desc())
+            .limit(1)
+        )
+        return rows[0] if rows else None
 
     async def get_indicators_history(
         self,
         instrument_id: int,
         days: int = 30
-    ) -> List[IndicatorDaily]:
-        """Получает историю индикаторов за N дней."""
-        async with self.async_session() as session:
-            result = await session.execute(
-                select(IndicatorDaily)
-                .where(IndicatorDaily.instrument_id == instrument_id)
-                .order_by(IndicatorDaily.date.desc())
-                .limit(days)
-            )
-            return list(result.scalars().all())
+    ) -> List[Row]:
+        """Получает историю индикаторов за N дней (Row с колонками indicators_daily)."""
+        return await self._read(
+            select(IndicatorDaily)
+            .where(IndicatorDaily.instrument_id == instrument_id)
+            .order_by(IndicatorDaily.date.desc())
+            .limit(days)
+        )
 
     # ═══════════════════════════════════════════════════════════
     # Сигналы
@@ -626,24 +1253,111 @@ class Repository:
 
     async def save_signal(self, data: Dict[str, Any]) -> Signal:
         """Сохраняет сигнал."""
-        async with self.async_session() as session:
-            signal = Signal(**data)
-            session.add(signal)
-            await session.commit()
-            await session.refresh(signal)
-            logger.info("signal_saved", signal_id=signal.id, type=signal.signal_type)
+        async with self._transaction() as session:
+            result = await session.execute(
+                insert(Signal).values(**data).returning(Signal)
+            )
+            signal = result.scalar_one()
+            logger.debug("signal_saved", signal_id=signal.id, type=signal.signal_type)
             return signal
 
-    async def get_today_signals(self) -> List[Signal]:
-        """Получает сигналы за сегодня."""
-        async with self.async_session() as session:
-            today = date.today()
+    async def get_today_signals(
+        self,
+        day: Optional[date] = None,
+        with_instrument: bool = False
+    ) -> List[Signal]:
+        """
+        Получает сигналы за сегодня (или за day).
+
+        Фильтр — полуинтервал по signal_time, без func.date(), чтобы
+        работал индекс ix_signals_signal_time (range scan).
+
+        Args:
+            day: Дата (по умолчанию — сегодня)
+            with_instrument: Подгрузить signal.instrument одним
+                SELECT ... IN (selectinload) — связи lazy="raise"
+        """
+        start, end = _day_range(day or date.today())
+        stmt = (
+            select(Signal)
+            .where(Signal.signal_time >= start, Signal.signal_time < end)
+            .order_by(Signal.signal_time.desc())
+        )
+        if with_instrument:
+            stmt = stmt.options(selectinload(Signal.instrument))
+        async with self._session() as session:
+            result = await session.execute(stmt)
+            return list(result.scalars().all())
+
+    async def mark_signal_executed(
+        self,
+        signal_id: int,
+        executed_price: float,
+        executed_at: Optional[datetime] = None
+    ) -> bool:
+        """
+        Помечает сигнал исполненным.
+
+        Прямой UPDATE ... WHERE id = ? — без предварительного SELECT
+        и без загрузки ORM-объекта.
+
+        Returns:
+            True если сигнал найден и обновлён
+        """
+        async with self._transaction() as session:
             result = await session.execute(
-                select(Signal)
-                .where(func.date(Signal.signal_time) == today)
-                .order_by(Signal.signal_time.desc())
+                update(Signal)
+                .where(Signal.id == signal_id)
+                .values(
+                    is_executed=True,
+                    executed_price=executed_price,
+                    # «Сейчас» вычисляет БД: одни часы с остальными строками
+                    executed_at=(
+                        executed_at if executed_at is not None
+                        else func.timezone("utc", func.now())
+                    ),
+                )
+                .execution_options(synchronize_session=False)
             )
-            return list(result.scalars().all())
+        return result.rowcount > 0
+
+    async def mark_signals_executed(
+        self,
+        items: List[Tuple[int, float, datetime]]
+    ) -> int:
+        """
+        Помечает пачку сигналов исполненными одним UPDATE ... FROM (VALUES ...).
+
+        Args:
+            items: Кортежи (signal_id, executed_price, executed_at)
+
+        Returns:
+            Количество обновлённых сигналов
+        """
+        if not items:
+            return 0
+        updated = 0
+        async with self._transaction() as session:
+            for i in range(0, len(items), BULK_CHUNK_SIZE):
+                v = values(
+                    column("id", Integer),
+                    column("price", Float),
+                    column("t", DateTime),
+                    name="v",
+                ).data(items[i:i + BULK_CHUNK_SIZE])
+                result = await session.execute(
+                    update(Signal)
+                    .where(Signal.id == v.c.id)
+                    .values(
+                        is_executed=True,
+                        executed_price=v.c.price,
+                        executed_at=v.c.t,
+                    )
+                    .execution_options(synchronize_session=False)
+                )
+                updated += result.rowcount
+        logger.info("signals_marked_executed", count=updated)
+        return updated
 
     # ═══════════════════════════════════════════════════════════
     # Сделки
@@ -651,10 +1365,71 @@ class Repository:
 
     async def save_trade(self, data: Dict[str, Any]) -> Trade:
         """Сохраняет сделку."""
-        async with self.async_session() as session:
-            trade = Trade(**data)
-            session.add(trade)
-            await session.commit()
-            await session.refresh(trade)
-            logger.info("trade_saved", trade_id=trade.id, pnl=trade.pnl_rub)
-            return trade
\ No newline at end of file
+        async with self._transaction() as session:
+            result = await session.execute(
+                insert(Trade).values(**data).returning(Trade)
+            )
+            trade = result.scalar_one()
+            logger.debug("trade_saved", trade_id=trade.id, pnl=trade.pnl_rub)
+            return trade
+
+    async def get_today_trades(
+        self,
+        day: Optional[date] = None,
+        with_instrument: bool = False
+    ) -> List[Trade]:
+        """
+        Получает сделки за сегодня или за day (по entry_time).
+
+        Args:
+            day: Дата (по умолчанию — сегодня)
+            with_instrument: Подгрузить trade.instrument и trade.signal
+                батч-запросами (selectinload) — связи lazy="raise"
+        """
+        start, end = _day_range(day or date.today())
+        stmt = (
+            select(Trade)
+            .where(Trade.entry_time >= start, Trade.entry_time < end)
+            .order_by(Trade.entry_time.desc())
+        )
+        if with_instrument:
+            stmt = stmt.options(
+                selectinload(Trade.instrument), selectinload(Trade.signal)
+            )
+        async with self._session() as session:
+            result = await session.execute(stmt)
+            return list(result.scalars().all())
+
+    async def get_today_pnl(self, day: Optional[date] = None) -> float:
+        """
+        PnL сделок за сегодня или за day (по entry_time).
+
+        Суммирует в БД — по сети передаётся одно число, а не строки сделок.
+        Фильтр — диапазон по entry_time, без func.date(), чтобы работал индекс.
+        """
+        start, end = _day_range(day or date.today())
+        async with self._session() as session:
+            result = await session.execute(
+                select(func.coalesce(func.sum(Trade.pnl_rub), 0.0))
+                .where(Trade.entry_time >= start, Trade.entry_time < end)
+            )
+            return float(result.scalar_one())
+
+    async def get_today_summary(self) -> Dict[str, Any]:
+        """
+        Сводка за день: сигналы, сделки и PnL.
+
+        Дата вычисляется один раз — все части относятся к одному дню
+        даже при переходе через полночь. Запросы идут в одной сессии
+        (одно соединение), PnL считается по уже загруженным сделкам.
+        """
+        today = date.today()
+        async with self.uow():
+            signals = await self.get_today_signals(today)
+            trades = await self.get_today_trades(today)
+        return {
+            "date": today,
+            "signals": signals,
+            "trades": trades,
+            "pnl_rub": float(sum(t.pnl_rub or 0.0 for t in trades)),
+        }
@@ -4,7 +4,10 @@
 - OrderManager: выставление заявок
 - PositionWatcher: отслеживание заявок с автовыставлением SL/TP
 """
-from executor.order_manager import OrderManager
+from executor.order_manager import OrderManager, StopOrderView, PositionView
 from executor.position_watcher import PositionWatcher, OrderType, TrackedOrder
 
-__all__ = ["OrderManager", "PositionWatcher", "OrderType", "TrackedOrder"]
\ No newline at end of file
+__all__ = [
+    "OrderManager", "StopOrderView", "PositionView",
+    "PositionWatcher", "OrderType", "TrackedOrder",
+]
\ No newline at end of file
@@ -7,22 +7,127 @@
 - Отмена заявок
 - Получение списка активных заявок
 """
+import asyncio
+import inspect
+import logging
+import time
+from functools import lru_cache, wraps
 from datetime import datetime, timedelta
-from typing import Optional, Dict, Any, List
-from decimal import Decimal
+from typing import Optional, Dict, Any, AsyncIterator, FrozenSet, List, NamedTuple, Tuple
 
 import pytz
 import structlog
+from grpc import StatusCode
 from t_tech.invest import (
+    Quotation,
     StopOrderDirection,
     StopOrderType,
     StopOrderExpirationType,
 )
-from t_tech.invest.utils import decimal_to_quotation, quotation_to_decimal
+from t_tech.invest.exceptions import AioRequestError
 
 logger = structlog.get_logger()
 MSK = pytz.timezone("Europe/Moscow")
 
+# Сколько разных цен держать в кеше конвертации
+PRICE_CACHE_SIZE = 16384
+
+# Quotation/MoneyValue: units + nano·10⁻⁹
+NANO = 1_000_000_000
+
+
+# Пул уже сконвертированных значений: (units, nano) → float.
+# Опросы стоп-заявок/позиций повторяют одни и те же цены и количества —
+# повтор отдаёт тот же объект float вместо нового
+_FLOAT_POOL: Dict[Tuple[int, int], float] = {}
+FLOAT_POOL_SIZE = 4096
+
+
+def _quotation_to_float(q) -> float:
+    """Quotation/MoneyValue → float напрямую, без Decimal (через пул)."""
+    key = (q.units, q.nano)
+    value = _FLOAT_POOL.get(key)
+    if value is None:
+        value = q.units + q.nano / NANO
+        if len(_FLOAT_POOL) < FLOAT_POOL_SIZE:
+            _FLOAT_POOL[key] = value
+    return value
+
+
+def _is_positive(q) -> bool:
+    """Quotation > 0 без конвертации (units и nano одного знака)."""
+    return q.units > 0 or (q.units == 0 and q.nano > 0)
+
+
+# Ответы dry_run (отдаются копией — вызывающий может дописывать ключи)
+_DRY_RUN_TP_BUY = {"success": True, "dry_run": True, "order_id": "DRY_RUN_ORDER_ID"}
+_DRY_RUN_SL = {"success": True, "dry_run": True, "order_id": "DRY_RUN_SL"}
+_DRY_RUN_TP = {"success": True, "dry_run": True, "order_id": "DRY_RUN_TP"}
+_DRY_RUN_CANCEL = {"success": True, "dry_run": True}
+
+
+class StopOrderView(NamedTuple):
+    """
+    Активная стоп-заявка (строка ответа get_stop_orders).
+    
+    Это кортеж, а не словарь: поля — атрибуты (order.figi), словарь — _asdict().
+    """
+    order_id: str
+    figi: str
+    direction: str
+    price: float
+    quantity: int
+    status: str
+    order_type: str
+
+
+class PositionView(NamedTuple):
+    """
+    Позиция портфеля (строка ответа get_positions).
+    
+    Это кортеж, а не словарь: поля — атрибуты (pos.figi), словарь — _asdict().
+    """
+    figi: str
+    quantity: float
+    average_price: float
+    current_price: float
+    expected_yield: float
+
+
+# Поля позиции → извлечение из PortfolioPosition (для get_positions(fields=...))
+_POSITION_FIELDS = {
+    "figi": lambda pos: pos.figi,
+    "quantity": lambda pos: _quotation_to_float(pos.quantity),
+    "average_price": lambda pos: _quotation_to_float(pos.average_position_price),
+    "current_price": lambda pos: _quotation_to_float(pos.current_price),
+    "expected_yield": lambda pos: _quotation_to_float(pos.expected_yield),
+}
+
+
+@lru_cache(maxsize=PRICE_CACHE_SIZE)
+def _nano_to_quotation(price_nano: int) -> Quotation:
+    """
+    Цена в единицах 10⁻⁹ → Quotation (с кешем).
+    
+    units и nano получают один знак (как требует API).
+    Возвращаемый Quotation общий для всех вызовов — не изменять.
+    """
+    units, nano = divmod(abs(price_nano), NANO)
+    if price_nano < 0:
+        units, nano = -units, -nano
+    return Quotation(units=units, nano=nano)
+
+
+def _price_to_quotation(price: float) -> Quotation:
+    """
+    Цена заявки → Quotation.
+    
+    Кеш — по цене, округлённой до nano: бот повторно выставляет заявки
+    по одним и тем же ценам (BB lower, ретраи), и float-цены, которые
+    отличаются лишь шумом младших разрядов, попадают в одну запись.
+    """
+    return _nano_to_quotation(round(price * NANO))
+
 
 def get_session_end_time() -> datetime:
     """
@@ -42,6 +147,39 @@ def get_session_end_time() -> datetime:
     return session_end
 
 
+# Коды gRPC, при которых запрос не дошёл до обработки — можно повторить
+_RETRY_CODES = frozenset({StatusCode.UNAVAILABLE, StatusCode.RESOURCE_EXHAUSTED})
+# Для выставления заявок повторяем только отказ по лимиту: после
+# UNAVAILABLE заявка могла быть создана, повтор её задублирует
+_WRITE_RETRY_CODES = frozenset({StatusCode.RESOURCE_EXHAUSTED})
+# База экспоненциальной паузы между попытками, сек
+RPC_BACKOFF_BASE = 0.05
+
+
+def _rpc(error_event: str):
+    """
+    Общая обработка ошибок метода-заявки.
+    
+    Любое исключение → logger.exception(error_event, <аргументы вызова>)
+    и {"success": False, "error": str(e)}.
+    """
+    def decorator(method):
+        signature = inspect.signature(method)
+        
+        @wraps(method)
+        async def wrapper(self, *args, **kwargs):
+            try:
+                return await method(self, *args, **kwargs)
+            except Exception as e:
+                call_args = signature.bind(self, *args, **kwargs).arguments
+                call_args.pop("self")
+                self._exc(error_event, error=str(e), **call_args)
+                return {"success": False, "error": str(e)}
+        
+        return wrapper
+    return decorator
+
+
 class OrderManager:
     """
     Менеджер заявок.
@@ -56,12 +194,97 @@ class OrderManager:
         ...     )
     """
 
+    # Фиксированный набор атрибутов: без __dict__ у экземпляра
+    __slots__ = (
+        "client",
+        "config",
+        "account_id",
+        "_dry_run",
+        "logger",
+        "_log_info",
+        "_debug",
+        "_info",
+        "_warn",
+        "_err",
+        "_exc",
+        "_stop_orders",
+        "_operations",
+        "_tp_buy_kwargs",
+        "_sl_sell_kwargs",
+        "_tp_sell_kwargs",
+        "_cache_ttl",
+        "_stop_cache",
+        "_pos_cache",
+        "_inflight",
+        "_cache_gen",
+        "_rpc_timeout",
+        "_rpc_retries",
+    )
+
     def __init__(self, tinkoff_client, config):
         self.client = tinkoff_client
         self.config = config
         self.account_id = config.tinkoff.account_id
+        self._dry_run = bool(config.dry_run)
+        
+        # Без счёта боевые заявки невозможны — ошибка сразу, а не на каждом вызове
+        if not self.account_id and not self._dry_run:
+            raise ValueError("TINKOFF_ACCOUNT_ID не указан в .env")
         self.logger = logger.bind(component="order_manager")
+        # Методы логгера привязаны заранее — без поиска атрибута на каждом вызове
+        self._debug = self.logger.debug
+        self._info = self.logger.info
+        self._warn = self.logger.warning
+        self._err = self.logger.error
+        self._exc = self.logger.exception
+        # INFO отфильтрован — payload для logger.info не собираем вовсе
+        self._log_info = config.log_level <= logging.INFO
+        
+        # Хотя бы одна попытка — иначе _call молча вернёт None
+        if config.tinkoff.rpc_retries < 1:
+            raise ValueError(
+                f"TINKOFF_RPC_RETRIES должен быть >= 1 (указано {config.tinkoff.rpc_retries})"
+            )
+        self._rpc_timeout = config.tinkoff.rpc_timeout
+        self._rpc_retries = config.tinkoff.rpc_retries
+        
+        # Сервисы API кешируются один раз: OrderManager создаётся внутри
+        # async with TinkoffClient, где client._services уже открыт
+        services = tinkoff_client._services
+        self._stop_orders = services.stop_orders
+        self._operations = services.operations
+        
+        # Постоянные аргументы post_stop_order по типу заявки
+        self._tp_buy_kwargs = {
+            "direction": StopOrderDirection.STOP_ORDER_DIRECTION_BUY,
+            "account_id": self.account_id,
+            "stop_order_type": StopOrderType.STOP_ORDER_TYPE_TAKE_PROFIT,
+            "expiration_type": StopOrderExpirationType.STOP_ORDER_EXPIRATION_TYPE_GOOD_TILL_DATE,
+        }
+        self._sl_sell_kwargs = {
+            "direction": StopOrderDirection.STOP_ORDER_DIRECTION_SELL,
+            "account_id": self.account_id,
+            "stop_order_type": StopOrderType.STOP_ORDER_TYPE_STOP_LOSS,
+            "expiration_type": StopOrderExpirationType.STOP_ORDER_EXPIRATION_TYPE_GOOD_TILL_CANCEL,
+        }
+        self._tp_sell_kwargs = {
+            "direction": StopOrderDirection.STOP_ORDER_DIRECTION_SELL,
+            "account_id": self.account_id,
+            "stop_order_type": StopOrderType.STOP_ORDER_TYPE_TAKE_PROFIT,
+            "expiration_type": StopOrderExpirationType.STOP_ORDER_EXPIRATION_TYPE_GOOD_TILL_CANCEL,
+        }
+        
+        # Кеш состояния счёта: (monotonic-время, значение)
+        self._cache_ttl = config.tinkoff.state_cache_ttl
+        self._stop_cache: Tuple[float, Optional[List[StopOrderView]]] = (0.0, None)
+        self._pos_cache: Tuple[float, Optional[List[PositionView]]] = (0.0, None)
+        
+        # Запросы в полёте: одновременные вызовы ждут один RPC
+        self._inflight: Dict[str, asyncio.Task] = {}
+        # Поколение кеша: ответ, начатый до сброса, в кеш не пишется
+        self._cache_gen = 0
 
+    @_rpc("order_error")
     async def place_take_profit_buy(
         self,
         figi: str,
@@ -83,82 +306,88 @@ class OrderManager:
         Returns:
             Dict с результатом
         """
-        self.logger.info("place_take_profit_buy_called",
-                        figi=figi,
-                        quantity=quantity,
-                        price=price,
-                        account_id=self.account_id,
-                        dry_run=self.config.dry_run)
-        
-        # Проверка account_id
-        if not self.account_id:
-            self.logger.error("no_account_id", message="TINKOFF_ACCOUNT_ID не указан")
-            return {
-                "success": False,
-                "error": "TINKOFF_ACCOUNT_ID не указан в .env"
-            }
-        
-        # Проверка quantity
+        # Проверка quantity — и в dry_run, чтобы ответ совпадал с боевым
         if quantity <= 0:
-            self.logger.error("invalid_quantity", quantity=quantity)
+            self._err("invalid_quantity", quantity=quantity)
             return {
                 "success": False,
                 "error": f"Некорректное количество лотов: {quantity}"
             }
         
-        # Dry run режим
-        if self.config.dry_run:
-            self.logger.warning("dry_run_mode", 
-                              action="place_take_profit_buy",
-                              figi=figi,
-                              quantity=quantity,
-                              price=price)
-            return {
-                "success": True,
-                "dry_run": True,
-                "order_id": "DRY_RUN_ORDER_ID",
-                "message": f"Заявка НЕ выставлена (dry_run=True). Было бы: TAKE_PROFIT BUY {quantity} лот(ов) по {price}"
-            }
+        # Dry run режим — до логов
+        if self._dry_run:
+            self._debug("dry_run_mode",
+                        action="place_take_profit_buy",
+                        figi=figi,
+                        quantity=quantity,
+                        price=price)
+            return dict(_DRY_RUN_TP_BUY)
         
-        try:
-            self.logger.info("calling_tinkoff_api", action="post_stop_order")
-            services = self.client._services
-            
-            # Время окончания заявки — конец сессии
-            expire_date = get_session_end_time()
-            
-            # Выставляем отложенную заявку тейк-профит на покупку
-            response = await services.stop_orders.post_stop_order(
-                figi=figi,
-                quantity=quantity,
-                stop_price=decimal_to_quotation(Decimal(str(price))),
-                direction=StopOrderDirection.STOP_ORDER_DIRECTION_BUY,
-                account_id=self.account_id,
-                stop_order_type=StopOrderType.STOP_ORDER_TYPE_TAKE_PROFIT,
-                expiration_type=StopOrderExpirationType.STOP_ORDER_EXPIRATION_TYPE_GOOD_TILL_DATE,
-                expire_date=expire_date,
+        if self._log_info:
+            self._info("place_take_profit_buy_called",
+                       figi=figi,
+                       quantity=quantity,
+                       price=price,
+                       account_id=self.account_id)
+            self._info("calling_tinkoff_api", action="post_stop_order")
+        
+        # Время окончания заявки — конец сессии
+        expire_date = get_session_end_time()
+        
+        # Выставляем отложенную заявку тейк-профит на покупку
+        response = await self._call(
+            self._stop_orders.post_stop_order,
+            write=True,
+            figi=figi,
+            quantity=quantity,
+            stop_price=_price_to_quotation(price),
+            expire_date=expire_date,
+            **self._tp_buy_kwargs,
+        )
+        
+        self.invalidate_state_cache()
+        if self._log_info:
+            self._info("take_profit_buy_placed",
+                       order_id=response.stop_order_id,
+                       figi=figi,
+                       quantity=quantity,
+                       price=price,
+                       expires=expire_date.strftime("%Y-%m-%d %H:%M"))
+        
+        return {
+            "success": True,
+            "order_id": response.stop_order_id,
+            "expires": expire_date.isoformat(),
+        }
+
+    async def place_take_profit_buys(
+        self,
+        orders: List[Dict[str, Any]],
+    ) -> List[Dict[str, Any]]:
+        """
+        Выставляет пачку отложенных заявок Тейк-профит на ПОКУПКУ.
+
+        Заявки отправляются параллельно (asyncio.gather) — RPC
+        мультиплексируются в одном gRPC-канале, и вся пачка занимает
+        примерно один round trip вместо N последовательных.
+
+        Args:
+            orders: Словари с ключами figi, quantity, price
+
+        Returns:
+            Результаты в том же порядке, что и orders
+            (формат — как у place_take_profit_buy)
+        """
+        return list(await asyncio.gather(*(
+            self.place_take_profit_buy(
+                figi=o["figi"],
+                quantity=o["quantity"],
+                price=o["price"],
             )
-            
-            self.logger.info("take_profit_buy_placed",
-                           order_id=response.stop_order_id,
-                           figi=figi,
-                           quantity=quantity,
-                           price=price,
-                           expires=expire_date.strftime("%Y-%m-%d %H:%M"))
-            
-            return {
-                "success": True,
-                "order_id": response.stop_order_id,
-                "expires": expire_date.isoformat(),
-            }
-            
-        except Exception as e:
-            self.logger.exception("order_error", figi=figi, error=str(e))
-            return {
-                "success": False,
-                "error": str(e)
-            }
+            for o in orders
+        )))
 
+    @_rpc("stop_loss_error")
     async def place_stop_loss_sell(
         self,
         figi: str,
@@ -171,37 +400,30 @@ class OrderManager:
         Сработает когда цена ОПУСТИТСЯ до указанной.
         Бессрочная заявка (пока не сработает или не отменим).
         """
-        self.logger.info("place_stop_loss_sell_called",
-                        figi=figi, quantity=quantity, price=price)
+        if self._dry_run:
+            return dict(_DRY_RUN_SL)
         
-        if not self.account_id:
-            return {"success": False, "error": "TINKOFF_ACCOUNT_ID не указан"}
+        if self._log_info:
+            self._info("place_stop_loss_sell_called",
+                       figi=figi, quantity=quantity, price=price)
         
-        if self.config.dry_run:
-            return {"success": True, "dry_run": True, "order_id": "DRY_RUN_SL"}
+        response = await self._call(
+            self._stop_orders.post_stop_order,
+            write=True,
+            figi=figi,
+            quantity=quantity,
+            stop_price=_price_to_quotation(price),
+            **self._sl_sell_kwargs,
+        )
         
-        try:
-            services = self.client._services
-            
-            response = await services.stop_orders.post_stop_order(
-                figi=figi,
-                quantity=quantity,
-                stop_price=decimal_to_quotation(Decimal(str(price))),
-                direction=StopOrderDirection.STOP_ORDER_DIRECTION_SELL,
-                account_id=self.account_id,
-                stop_order_type=StopOrderType.STOP_ORDER_TYPE_STOP_LOSS,
-                expiration_type=StopOrderExpirationType.STOP_ORDER_EXPIRATION_TYPE_GOOD_TILL_CANCEL,
-            )
-            
-            self.logger.info("stop_loss_sell_placed",
-                           order_id=response.stop_order_id, price=price)
-            
-            return {"success": True, "order_id": response.stop_order_id}
-            
-        except Exception as e:
-            self.logger.exception("stop_loss_error", error=str(e))
-            return {"success": False, "error": str(e)}
+        self.invalidate_state_cache()
+        if self._log_info:
+            self._info("stop_loss_sell_placed",
+                       order_id=response.stop_order_id, price=price)
+        
+        return {"success": True, "order_id": response.stop_order_id}
 
+    @_rpc("take_profit_error")
     async def place_take_profit_sell(
         self,
         figi: str,
@@ -214,106 +436,314 @@ class OrderManager:
         Сработает когда цена ПОДНИМЕТСЯ до указанной.
         Бессрочная заявка.
         """
-        self.logger.info("place_take_profit_sell_called",
-                        figi=figi, quantity=quantity, price=price)
+        if self._dry_run:
+            return dict(_DRY_RUN_TP)
         
-        if not self.account_id:
-            return {"success": False, "error": "TINKOFF_ACCOUNT_ID не указан"}
+        if self._log_info:
+            self._info("place_take_profit_sell_called",
+                       figi=figi, quantity=quantity, price=price)
         
-        if self.config.dry_run:
-            return {"success": True, "dry_run": True, "order_id": "DRY_RUN_TP"}
+        response = await self._call(
+            self._stop_orders.post_stop_order,
+            write=True,
+            figi=figi,
+            quantity=quantity,
+            stop_price=_price_to_quotation(price),
+            **self._tp_sell_kwargs,
+        )
         
-        try:
-            services = self.client._services
-            
-            response = await services.stop_orders.post_stop_order(
-                figi=figi,
-                quantity=quantity,
-                stop_price=decimal_to_quotation(Decimal(str(price))),
-                direction=StopOrderDirection.STOP_ORDER_DIRECTION_SELL,
-                account_id=self.account_id,
-                stop_order_type=StopOrderType.STOP_ORDER_TYPE_TAKE_PROFIT,
-                expiration_type=StopOrderExpirationType.STOP_ORDER_EXPIRATION_TYPE_GOOD_TILL_CANCEL,
-            )
-            
-            self.logger.info("take_profit_sell_placed",
-                           order_id=response.stop_order_id, price=price)
-            
-            return {"success": True, "order_id": response.stop_order_id}
-            
-        except Exception as e:
-            self.logger.exception("take_profit_error", error=str(e))
-            return {"success": False, "error": str(e)}
+        self.invalidate_state_cache()
+        if self._log_info:
+            self._info("take_profit_sell_placed",
+                       order_id=response.stop_order_id, price=price)
+        
+        return {"success": True, "order_id": response.stop_order_id}
 
+    @_rpc("cancel_stop_error")
     async def cancel_stop_order(self, order_id: str) -> Dict[str, Any]:
         """Отменяет стоп-заявку."""
-        self.logger.info("cancel_stop_order_called", order_id=order_id)
+        if self._dry_run:
+            return dict(_DRY_RUN_CANCEL)
+        
+        if self._log_info:
+            self._info("cancel_stop_order_called", order_id=order_id)
+        
+        await self._call(
+            self._stop_orders.cancel_stop_order,
+            write=True,
+            account_id=self.account_id,
+            stop_order_id=order_id
+        )
+        self.invalidate_state_cache()
+        if self._log_info:
+            self._info("stop_order_cancelled", order_id=order_id)
+        return {"success": True}
+
+    async def _call(self, rpc, *, write: bool = False, **kwargs):
+        """
+        RPC с дедлайном rpc_timeout и повтором с экспоненциальной паузой.
+        
+        Повторяются только коды _RETRY_CODES (для write — _WRITE_RETRY_CODES),
+        остальные ошибки и исчерпание попыток пробрасываются.
         
-        if self.config.dry_run:
-            return {"success": True, "dry_run": True}
+        Write-вызовы идут без дедлайна: по таймауту заявка могла уже встать
+        на бирже, а ответ {"success": False} оставил бы её без отслеживания
+        и без SL/TP.
+        """
+        retry_codes = _WRITE_RETRY_CODES if write else _RETRY_CODES
+        name = getattr(rpc, "__name__", repr(rpc))
+        for attempt in range(self._rpc_retries):
+            try:
+                if write:
+                    return await rpc(**kwargs)
+                return await asyncio.wait_for(rpc(**kwargs), timeout=self._rpc_timeout)
+            except asyncio.TimeoutError:
+                raise asyncio.TimeoutError(
+                    f"{name}: нет ответа за {self._rpc_timeout} с"
+                ) from None
+            except AioRequestError as e:
+                if e.code not in retry_codes or attempt + 1 == self._rpc_retries:
+                    raise
+                delay = RPC_BACKOFF_BASE * 2 ** attempt
+                self._warn("rpc_retry",
+                           rpc=name,
+                           code=e.code.name,
+                           attempt=attempt + 1,
+                           delay=delay)
+                await asyncio.sleep(delay)
+
+    # ═══════════════════════════════════════════════════════════
+    # Состояние счёта
+    # ═══════════════════════════════════════════════════════════
+
+    def invalidate_state_cache(self) -> None:
+        """Сбрасывает кеш стоп-заявок и позиций."""
+        self._stop_cache = (0.0, None)
+        self._pos_cache = (0.0, None)
+        self._cache_gen += 1
+        self._inflight.clear()
+
+    def _cached(self, entry) -> Optional[list]:
+        """Значение из кеша, если не старше TTL."""
+        ts, value = entry
+        if value is not None and time.monotonic() - ts < self._cache_ttl:
+            return value
+        return None
+
+    async def _single_flight(self, key: str, fetch):
+        """
+        Один RPC на все одновременные вызовы с ключом key.
+        
+        Первый вызов запускает fetch() задачей, остальные ждут её же.
+        shield — отмена одного ожидающего не отменяет запрос для других.
+        """
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(fetch())
+            self._inflight[key] = task
             
-        try:
-            services = self.client._services
-            await services.stop_orders.cancel_stop_order(
-                account_id=self.account_id,
-                stop_order_id=order_id
+            def _done(t: asyncio.Task) -> None:
+                # После invalidate_state_cache ключ может занять новый запрос
+                if self._inflight.get(key) is t:
+                    del self._inflight[key]
+            
+            task.add_done_callback(_done)
+        return await asyncio.shield(task)
+
+    async def _raw_get_stop_orders(self):
+        """Сырой ответ GetStopOrders."""
+        return await self._call(
+            self._stop_orders.get_stop_orders,
+            account_id=self.account_id
+        )
+
+    async def _raw_get_portfolio(self):
+        """Сырой ответ GetPortfolio."""
+        return await self._call(
+            self._operations.get_portfolio,
+            account_id=self.account_id
+        )
+
+    @staticmethod
+    def _stop_order_view(order) -> StopOrderView:
+        """Стоп-заявка из ответа API → StopOrderView."""
+        return StopOrderView(
+            order.stop_order_id,
+            order.figi,
+            order.direction.name,
+            _quotation_to_float(order.stop_price),
+            order.lots_requested,
+            order.status.name,
+            order.stop_order_type.name,
+        )
+
+    @staticmethod
+    def _stop_orders_to_views(response) -> List[StopOrderView]:
+        """Стоп-заявки из ответа API → список StopOrderView."""
+        view = OrderManager._stop_order_view
+        return [view(order) for order in response.stop_orders]
+
+    @staticmethod
+    def _positions_to_views(response) -> List[PositionView]:
+        """
+        Позиции (quantity > 0) из ответа API → список PositionView.
+        
+        Нулевые позиции отсекаются по сырому Quotation (_is_positive) —
+        без конвертации.
+        """
+        q2f = _quotation_to_float
+        return [
+            PositionView(
+                pos.figi,
+                q2f(pos.quantity),
+                q2f(pos.average_position_price),
+                q2f(pos.current_price),
+                q2f(pos.expected_yield),
             )
-            self.logger.info("stop_order_cancelled", order_id=order_id)
-            return {"success": True}
-        except Exception as e:
-            self.logger.error("cancel_stop_error", error=str(e))
-            return {"success": False, "error": str(e)}
+            for pos in response.positions
+            if _is_positive(pos.quantity)
+        ]
 
-    async def get_stop_orders(self) -> List[Dict[str, Any]]:
-        """Получает список активных стоп-заявок."""
+    @staticmethod
+    def _positions_to_dicts(response, fields: FrozenSet[str]) -> List[Dict[str, Any]]:
+        """Позиции (quantity > 0) → словари только с ключами fields."""
+        getters = [(name, _POSITION_FIELDS[name]) for name in fields]
+        return [
+            {name: get(pos) for name, get in getters}
+            for pos in response.positions
+            if _is_positive(pos.quantity)
+        ]
+
+    async def _fetch_stop_orders(self) -> List[StopOrderView]:
+        """Запрос стоп-заявок с записью в кеш."""
+        gen = self._cache_gen
+        orders = self._stop_orders_to_views(await self._raw_get_stop_orders())
+        if gen == self._cache_gen:
+            self._stop_cache = (time.monotonic(), orders)
+        self._debug("stop_orders_fetched", count=len(orders))
+        return orders
+
+    async def _fetch_positions(self) -> List[PositionView]:
+        """Запрос позиций с записью в кеш."""
+        gen = self._cache_gen
+        positions = self._positions_to_views(await self._raw_get_portfolio())
+        if gen == self._cache_gen:
+            self._pos_cache = (time.monotonic(), positions)
+        self._debug("positions_fetched", count=len(positions))
+        return positions
+
+    async def get_stop_orders(self) -> List[StopOrderView]:
+        """
+        Получает список активных стоп-заявок.
+        
+        Строки — StopOrderView (NamedTuple, не словарь): поля читаются как
+        атрибуты (order.figi), прежний словарь — order._asdict().
+        
+        Ответ кешируется на state_cache_ttl секунд (сброс — при выставлении
+        и отмене заявок), одновременные промахи кеша делят один RPC.
+        Список общий для вызовов — не изменять.
+        """
+        cached = self._cached(self._stop_cache)
+        if cached is not None:
+            return cached
+        
         try:
-            services = self.client._services
-            response = await services.stop_orders.get_stop_orders(
-                account_id=self.account_id
-            )
-            
-            orders = []
-            for order in response.stop_orders:
-                orders.append({
-                    "order_id": order.stop_order_id,
-                    "figi": order.figi,
-                    "direction": order.direction.name,
-                    "price": float(quotation_to_decimal(order.stop_price)),
-                    "quantity": order.lots_requested,
-                    "status": order.status.name,
-                    "order_type": order.stop_order_type.name,
-                })
-            
-            self.logger.debug("stop_orders_fetched", count=len(orders))
-            return orders
+            return await self._single_flight("stop_orders", self._fetch_stop_orders)
             
         except Exception as e:
-            self.logger.error("get_stop_orders_error", error=str(e))
+            self._err("get_stop_orders_error", error=str(e))
             return []
 
-    async def get_positions(self) -> List[Dict[str, Any]]:
-        """Получает текущие позиции в портфеле."""
+    async def iter_stop_orders(self) -> AsyncIterator[StopOrderView]:
+        """
+        Активные стоп-заявки по одной — по мере разбора ответа.
+        
+        GetStopOrders — унарный RPC, поэтому между строками управление
+        отдаётся циклу (sleep(0)): потребитель обрабатывает первую строку,
+        не дожидаясь разбора всего ответа. Свежий кеш отдаётся сразу;
+        полностью прочитанный ответ записывается в кеш.
+        """
+        cached = self._cached(self._stop_cache)
+        if cached is not None:
+            for order in cached:
+                yield order
+            return
+        
+        gen = self._cache_gen
         try:
-            services = self.client._services
-            response = await services.operations.get_portfolio(
-                account_id=self.account_id
-            )
-            
-            positions = []
-            for pos in response.positions:
-                qty = float(quotation_to_decimal(pos.quantity))
-                if qty > 0:
-                    positions.append({
-                        "figi": pos.figi,
-                        "quantity": qty,
-                        "average_price": float(quotation_to_decimal(pos.average_position_price)),
-                        "current_price": float(quotation_to_decimal(pos.current_price)),
-                        "expected_yield": float(quotation_to_decimal(pos.expected_yield)),
-                    })
-            
-            self.logger.debug("positions_fetched", count=len(positions))
+            response = await self._single_flight("stop_orders_raw", self._raw_get_stop_orders)
+        except Exception as e:
+            self._err("get_stop_orders_error", error=str(e))
+            return
+        
+        view = self._stop_order_view
+        orders = []
+        for order in response.stop_orders:
+            row = view(order)
+            orders.append(row)
+            yield row
+            await asyncio.sleep(0)
+        
+        if gen == self._cache_gen:
+            self._stop_cache = (time.monotonic(), orders)
+
+    async def get_positions(
+        self,
+        fields: Optional[FrozenSet[str]] = None,
+    ) -> List[Any]:
+        """
+        Получает текущие позиции в портфеле.
+        
+        Кешируется так же, как get_stop_orders.
+        
+        Args:
+            fields: Нужные ключи (например {"figi", "quantity"}) —
+                остальные цены не конвертируются. None — все поля.
+        
+        Returns:
+            Список PositionView, а при fields — словари только с этими ключами
+        """
+        if fields is not None:
+            unknown = set(fields) - _POSITION_FIELDS.keys()
+            if unknown:
+                raise ValueError(f"Неизвестные поля позиции: {sorted(unknown)}")
+        
+        cached = self._cached(self._pos_cache)
+        if cached is not None:
+            if fields is None:
+                return cached
+            return [{name: getattr(pos, name) for name in fields} for pos in cached]
+        
+        try:
+            if fields is None:
+                return await self._single_flight("positions", self._fetch_positions)
+            response = await self._single_flight("portfolio", self._raw_get_portfolio)
+            positions = self._positions_to_dicts(response, frozenset(fields))
+            self._debug("positions_fetched", count=len(positions), fields=sorted(fields))
             return positions
             
         except Exception as e:
-            self.logger.error("get_positions_error", error=str(e))
-            return []
\ No newline at end of file
+            self._err("get_positions_error", error=str(e))
+            return []
+
+    async def get_account_snapshot(self) -> Dict[str, list]:
+        """
+        Стоп-заявки и позиции одним обращением.
+
+        Оба запроса идут параллельно (asyncio.gather) по одному gRPC-каналу:
+        время — по более медленному из двух, а не сумма. Свежие данные
+        берутся из кеша. Ошибка одного запроса не теряет результат
+        другого — для него пустой список.
+
+        Returns:
+            {"stop_orders": [...], "positions": [...]}
+        """
+        stop_orders, positions = await asyncio.gather(
+            self.get_stop_orders(),
+            self.get_positions(),
+        )
+        
+        self._debug("account_snapshot_fetched",
+                    stop_orders=len(stop_orders),
+                    positions=len(positions))
+        return {"stop_orders": stop_orders, "positions": positions}
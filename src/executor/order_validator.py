@@ -10,20 +10,49 @@
 4. Торговые часы
 5. Concurrent positions limit
 """
+import logging
 from dataclasses import dataclass, field
 from datetime import datetime, time
-from typing import Optional, Dict, Any, List, Tuple
-from decimal import Decimal, ROUND_DOWN
+from time import monotonic
+from typing import Any, Dict, List, Optional, Tuple
+from decimal import Decimal, ROUND_HALF_UP
 
 import structlog
 from zoneinfo import ZoneInfo
 
 logger = structlog.get_logger()
+# Один логгер на модуль — экземпляры валидатора делят его. Ленивый прокси:
+# привязка к конфигурации structlog — при первом вызове, а не при импорте
+_validator_logger = structlog.get_logger(component="order_validator")
 
 MSK = ZoneInfo("Europe/Moscow")
 
+# Шаг цены для SL/TP — копейки
+_PRICE_Q = Decimal("0.01")
 
-@dataclass
+
+def _round_price(price: float) -> float:
+    """
+    Округляет цену до копеек по-денежному (half-up).
+    
+    Decimal строится из repr, а не из двоичного значения: round(2.675, 2)
+    даёт 2.67 (двоичное 2.67499…), здесь — 2.68, как ожидает трейдер.
+    """
+    return float(Decimal(repr(price)).quantize(_PRICE_Q, rounding=ROUND_HALF_UP))
+
+
+# Шаблоны сообщений об отказе (%-форматирование)
+_ERR_PRICE_BELOW = "Цена входа (%.2f) должна быть НИЖЕ текущей (%.2f)"
+_ERR_DEVIATION = "Отклонение %.1f%% превышает лимит %s%%"
+_ERR_POSITION = "Позиция %s₽ превышает лимит %s₽ (%.0f%% депозита)"
+_ERR_DAILY_TRADES = "Достигнут лимит %d сделок в день"
+_ERR_DAILY_LOSS = "Достигнут лимит убытков %s₽ в день (текущий: %s₽)"
+
+# Как долго переиспользуется вычисленный ключ дня, сек
+DAY_KEY_TTL_SEC = 1.0
+
+
+@dataclass(slots=True)
 class ValidationResult:
     """Результат валидации."""
     is_valid: bool
@@ -40,21 +69,11 @@ class ValidationResult:
     position_value: Optional[float] = None
     
     def to_dict(self) -> Dict[str, Any]:
-        return {
-            "is_valid": self.is_valid,
-            "errors": self.errors,
-            "warnings": self.warnings,
-            "sl_price": self.sl_price,
-            "tp_price": self.tp_price,
-            "risk_rub": self.risk_rub,
-            "risk_pct": self.risk_pct,
-            "reward_rub": self.reward_rub,
-            "risk_reward_ratio": self.risk_reward_ratio,
-            "position_value": self.position_value,
-        }
+        # __slots__ (slots=True) — имена полей в порядке объявления
+        return {name: getattr(self, name) for name in self.__slots__}
 
 
-@dataclass
+@dataclass(slots=True)
 class FreeTradeConfig:
     """Настройки для свободного трейдинга."""
     # Включено ли
@@ -104,41 +123,94 @@ class OrderValidator:
     def __init__(self, config, free_trade_config: FreeTradeConfig = None):
         self.config = config
         self.ft = free_trade_config or FreeTradeConfig()
-        self.logger = logger.bind(component="order_validator")
+        self.logger = _validator_logger
+        # INFO отфильтрован — payload для logger.info не собираем
+        self._log_info = config.log_level <= logging.INFO
+        
+        # Границы торговых часов разбираются один раз (ft не меняется)
+        start_h, start_m = map(int, self.ft.trading_start.split(":"))
+        end_h, end_m = map(int, self.ft.trading_end.split(":"))
+        self._start_time = time(start_h, start_m)
+        self._end_time = time(end_h, end_m)
+        self._start_msg = f"Торги начинаются в {self.ft.trading_start} МСК"
+        self._end_msg = f"Торги заканчиваются в {self.ft.trading_end} МСК"
+        
+        # Части сообщений, зависящие только от конфига
+        self._max_daily_trades_msg = _ERR_DAILY_TRADES % self.ft.max_daily_trades
+        self._max_daily_loss_str = format(self.ft.max_daily_loss_rub, ",.0f")
+        
+        # Производные от конфига константы — считаются один раз
+        self._deposit_rub = float(config.trading.deposit_rub)
+        self._inv_deposit_rub_pct = 100.0 / self._deposit_rub  # risk_rub → % депозита
+        self._max_position_pct100 = config.risk.max_position_pct * 100.0
+        self._max_position_value = self._deposit_rub * config.risk.max_position_pct
+        self._max_position_value_str = format(self._max_position_value, ",.0f")
+        self._risk_rec_pct = config.trading.risk_per_trade_pct * 100.0
+        self._risk_warn_threshold_pct = self._risk_rec_pct * 1.5
+        
+        # Множители ATR со знаком направления: price = entry + mul * atr
+        self._long_mul = (-self.ft.sl_atr_multiplier, self.ft.tp_atr_multiplier)
+        self._short_mul = (self.ft.sl_atr_multiplier, -self.ft.tp_atr_multiplier)
+        
+        # Счётчики дневных операций: только за текущий день,
+        # при смене даты обнуляются сами (см. _roll_day)
+        self._today_ord = 0
+        self._trades_today = 0
+        self._loss_today = 0.0
+        
+        # Кеш ключа дня: (monotonic-время расчёта, ordinal даты МСК)
+        self._day_key_ts = float("-inf")
+        self._day_key = 0
+    
+    def _today_key(self) -> int:
+        """
+        Ключ для дневных счётчиков — ordinal сегодняшней даты МСК.
         
-        # Счётчики дневных операций (сбрасываются в полночь)
-        self._daily_trades: Dict[str, int] = {}  # date -> count
-        self._daily_loss: Dict[str, float] = {}  # date -> loss_rub
+        Пересчитывается не чаще раза в секунду.
+        """
+        now_m = monotonic()
+        if now_m - self._day_key_ts > DAY_KEY_TTL_SEC:
+            self._day_key = datetime.now(MSK).date().toordinal()
+            self._day_key_ts = now_m
+        return self._day_key
     
-    def _today_key(self) -> str:
-        """Ключ для дневных счётчиков."""
-        return datetime.now(MSK).strftime("%Y-%m-%d")
+    def _roll_day(self):
+        """Обнуляет счётчики, если наступил новый день."""
+        today = self._today_key()
+        if today != self._today_ord:
+            self._today_ord = today
+            self._trades_today = 0
+            self._loss_today = 0.0
     
     def _get_daily_trades(self) -> int:
         """Количество сделок сегодня."""
-        return self._daily_trades.get(self._today_key(), 0)
+        self._roll_day()
+        return self._trades_today
     
     def _get_daily_loss(self) -> float:
         """Убыток сегодня."""
-        return self._daily_loss.get(self._today_key(), 0.0)
+        self._roll_day()
+        return self._loss_today
     
     def increment_daily_trades(self):
         """Увеличивает счётчик дневных сделок."""
-        key = self._today_key()
-        self._daily_trades[key] = self._daily_trades.get(key, 0) + 1
+        self._roll_day()
+        self._trades_today += 1
     
     def add_daily_loss(self, loss_rub: float):
         """Добавляет убыток к дневному счётчику."""
         if loss_rub > 0:
-            key = self._today_key()
-            self._daily_loss[key] = self._daily_loss.get(key, 0.0) + loss_rub
+            self._roll_day()
+            self._loss_today += loss_rub
     
     def reset_daily_counters(self):
-        """Сбрасывает дневные счётчики (вызывать в полночь)."""
-        today = self._today_key()
-        # Оставляем только сегодняшние данные
-        self._daily_trades = {k: v for k, v in self._daily_trades.items() if k == today}
-        self._daily_loss = {k: v for k, v in self._daily_loss.items() if k == today}
+        """
+        Сбрасывает дневные счётчики прошлых дней.
+        
+        Оставлен для совместимости: смена дня обрабатывается
+        автоматически, хранятся только сегодняшние значения.
+        """
+        self._roll_day()
     
     def is_trading_hours(self) -> Tuple[bool, str]:
         """
@@ -155,18 +227,11 @@ class OrderValidator:
         
         current_time = now.time()
         
-        # Парсим время из конфига
-        start_h, start_m = map(int, self.ft.trading_start.split(":"))
-        end_h, end_m = map(int, self.ft.trading_end.split(":"))
-        
-        start_time = time(start_h, start_m)
-        end_time = time(end_h, end_m)
+        if current_time < self._start_time:
+            return False, self._start_msg
         
-        if current_time < start_time:
-            return False, f"Торги начинаются в {self.ft.trading_start} МСК"
-        
-        if current_time > end_time:
-            return False, f"Торги заканчиваются в {self.ft.trading_end} МСК"
+        if current_time > self._end_time:
+            return False, self._end_msg
         
         return True, "OK"
     
@@ -188,16 +253,13 @@ class OrderValidator:
         
         # Для TP BUY цена должна быть ниже текущей
         if entry_price >= current_price:
-            return False, f"Цена входа ({entry_price:.2f}) должна быть НИЖЕ текущей ({current_price:.2f})"
+            return False, _ERR_PRICE_BELOW % (entry_price, current_price)
         
         # Проверяем отклонение
         deviation_pct = abs(entry_price - current_price) / current_price * 100
         
         if deviation_pct > self.ft.max_price_deviation_pct:
-            return False, (
-                f"Отклонение {deviation_pct:.1f}% превышает лимит "
-                f"{self.ft.max_price_deviation_pct}%"
-            )
+            return False, _ERR_DEVIATION % (deviation_pct, self.ft.max_price_deviation_pct)
         
         return True, "OK"
     
@@ -212,15 +274,12 @@ class OrderValidator:
             return False, "Количество лотов должно быть > 0"
         
         position_value = quantity_lots * lot_size * entry_price
-        deposit = self.config.trading.deposit_rub
-        max_position_pct = self.config.risk.max_position_pct
-        
-        max_position_value = deposit * max_position_pct
         
-        if position_value > max_position_value:
-            return False, (
-                f"Позиция {position_value:,.0f}₽ превышает лимит "
-                f"{max_position_value:,.0f}₽ ({max_position_pct*100:.0f}% депозита)"
+        if position_value > self._max_position_value:
+            return False, _ERR_POSITION % (
+                format(position_value, ",.0f"),
+                self._max_position_value_str,
+                self._max_position_pct100,
             )
         
         return True, "OK"
@@ -230,14 +289,14 @@ class OrderValidator:
         # Лимит сделок
         trades_today = self._get_daily_trades()
         if trades_today >= self.ft.max_daily_trades:
-            return False, f"Достигнут лимит {self.ft.max_daily_trades} сделок в день"
+            return False, self._max_daily_trades_msg
         
         # Лимит убытков
         loss_today = self._get_daily_loss()
         if loss_today >= self.ft.max_daily_loss_rub:
-            return False, (
-                f"Достигнут лимит убытков {self.ft.max_daily_loss_rub:,.0f}₽ в день "
-                f"(текущий: {loss_today:,.0f}₽)"
+            return False, _ERR_DAILY_LOSS % (
+                self._max_daily_loss_str,
+                format(loss_today, ",.0f"),
             )
         
         return True, "OK"
@@ -254,17 +313,18 @@ class OrderValidator:
         Returns:
             (sl_price, tp_price)
         """
-        sl_offset = atr * self.ft.sl_atr_multiplier
-        tp_offset = atr * self.ft.tp_atr_multiplier
-        
-        if direction == "long":
-            sl_price = entry_price - sl_offset
-            tp_price = entry_price + tp_offset
-        else:
-            sl_price = entry_price + sl_offset
-            tp_price = entry_price - tp_offset
-        
-        return round(sl_price, 2), round(tp_price, 2)
+        sl_mul, tp_mul = self._long_mul if direction == "long" else self._short_mul
+        return _round_price(entry_price + sl_mul * atr), _round_price(entry_price + tp_mul * atr)
+    
+    def _reject(self, ticker: str, error: str) -> ValidationResult:
+        """Отказ с одной ошибкой (лог + ValidationResult)."""
+        errors = [error]
+        self.logger.warning(
+            "validation_failed",
+            ticker=ticker,
+            errors=errors
+        )
+        return ValidationResult(is_valid=False, errors=errors)
     
     async def validate_buy_order(
         self,
@@ -291,26 +351,27 @@ class OrderValidator:
         Returns:
             ValidationResult
         """
-        errors = []
-        warnings = []
+        if self._log_info:
+            self.logger.info(
+                "validating_buy_order",
+                ticker=ticker,
+                entry_price=entry_price,
+                quantity_lots=quantity_lots,
+                current_price=current_price,
+                atr=atr
+            )
         
-        self.logger.info(
-            "validating_buy_order",
-            ticker=ticker,
-            entry_price=entry_price,
-            quantity_lots=quantity_lots,
-            current_price=current_price,
-            atr=atr
-        )
+        # Проверки от дешёвых к дорогим, до первой ошибки
         
         # 1. Торговые часы
         is_ok, reason = self.is_trading_hours()
         if not is_ok:
-            errors.append(f"⏰ {reason}")
+            return self._reject(ticker, f"⏰ {reason}")
         
         # 2. Concurrent positions
         if current_positions >= self.ft.max_concurrent_positions:
-            errors.append(
+            return self._reject(
+                ticker,
                 f"📊 Достигнут лимит {self.ft.max_concurrent_positions} "
                 f"одновременных позиций"
             )
@@ -318,38 +379,24 @@ class OrderValidator:
         # 3. Дневные лимиты
         is_ok, reason = self.validate_daily_limits()
         if not is_ok:
-            errors.append(f"📅 {reason}")
+            return self._reject(ticker, f"📅 {reason}")
         
         # 4. Валидация цены
         is_ok, reason = self.validate_price(entry_price, current_price)
         if not is_ok:
-            errors.append(f"💰 {reason}")
+            return self._reject(ticker, f"💰 {reason}")
         
         # 5. Валидация размера
         is_ok, reason = self.validate_quantity(quantity_lots, entry_price, lot_size)
         if not is_ok:
-            errors.append(f"📦 {reason}")
-        
-        # Если есть ошибки — возвращаем сразу
-        if errors:
-            self.logger.warning(
-                "validation_failed",
-                ticker=ticker,
-                errors=errors
-            )
-            return ValidationResult(
-                is_valid=False,
-                errors=errors,
-                warnings=warnings
-            )
+            return self._reject(ticker, f"📦 {reason}")
         
         # 6. Рассчитываем SL/TP
         sl_price, tp_price = self.calculate_sl_tp(entry_price, atr, "long")
         
         # Проверка что SL положительный
         if sl_price <= 0:
-            errors.append(f"🛑 SL получился отрицательным: {sl_price:.2f}")
-            return ValidationResult(is_valid=False, errors=errors, warnings=warnings)
+            return self._reject(ticker, f"🛑 SL получился отрицательным: {sl_price:.2f}")
         
         # 7. Расчёт риска
         quantity_shares = quantity_lots * lot_size
@@ -360,15 +407,16 @@ class OrderValidator:
         
         risk_rub = sl_offset * quantity_shares
         reward_rub = tp_offset * quantity_shares
-        risk_pct = risk_rub / self.config.trading.deposit_rub * 100
+        risk_pct = risk_rub * self._inv_deposit_rub_pct
         
         risk_reward_ratio = reward_rub / risk_rub if risk_rub > 0 else 0
         
         # Предупреждения
-        if risk_pct > self.config.trading.risk_per_trade_pct * 100 * 1.5:
+        warnings = []
+        if risk_pct > self._risk_warn_threshold_pct:
             warnings.append(
                 f"⚠️ Риск {risk_pct:.2f}% выше рекомендуемого "
-                f"{self.config.trading.risk_per_trade_pct * 100:.1f}%"
+                f"{self._risk_rec_pct:.1f}%"
             )
         
         if risk_reward_ratio < 2:
@@ -383,18 +431,18 @@ class OrderValidator:
                 f"может сработать сразу после входа"
             )
         
-        self.logger.info(
-            "validation_passed",
-            ticker=ticker,
-            sl_price=sl_price,
-            tp_price=tp_price,
-            risk_rub=round(risk_rub, 0),
-            risk_pct=round(risk_pct, 2)
-        )
+        if self._log_info:
+            self.logger.info(
+                "validation_passed",
+                ticker=ticker,
+                sl_price=sl_price,
+                tp_price=tp_price,
+                risk_rub=round(risk_rub, 0),
+                risk_pct=round(risk_pct, 2)
+            )
         
         return ValidationResult(
             is_valid=True,
-            errors=[],
             warnings=warnings,
             sl_price=sl_price,
             tp_price=tp_price,
@@ -406,6 +454,25 @@ class OrderValidator:
         )
 
 
+# Шаблоны сообщений Telegram — собираются одним format вместо списка строк
+_CONFIRM_TEMPLATE = (
+    "📋 <b>Подтвердите заявку</b>\n"
+    "\n"
+    "📌 <b>{ticker}</b>\n"
+    "📥 Цена входа: <b>{entry_price:,.2f} ₽</b>\n"
+    "📦 Количество: {quantity_lots} лот ({quantity_shares} шт)\n"
+    "\n"
+    "🛑 Stop-Loss: <b>{v.sl_price:,.2f} ₽</b>\n"
+    "🎯 Take-Profit: <b>{v.tp_price:,.2f} ₽</b>\n"
+    "\n"
+    "💸 Риск: <b>{v.risk_rub:,.0f} ₽</b> ({v.risk_pct:.2f}%)\n"
+    "💰 Потенц. прибыль: {v.reward_rub:,.0f} ₽\n"
+    "📊 R:R = 1:{v.risk_reward_ratio:.1f}\n"
+    "💼 Размер позиции: {v.position_value:,.0f} ₽"
+)
+_ERROR_TEMPLATE = "❌ <b>Заявка отклонена: {ticker}</b>\n"
+
+
 def format_confirmation_message(
     ticker: str,
     entry_price: float,
@@ -419,36 +486,22 @@ def format_confirmation_message(
     Returns:
         HTML-форматированное сообщение
     """
-    quantity_shares = quantity_lots * lot_size
-    
-    lines = [
-        f"📋 <b>Подтвердите заявку</b>",
-        "",
-        f"📌 <b>{ticker}</b>",
-        f"📥 Цена входа: <b>{entry_price:,.2f} ₽</b>",
-        f"📦 Количество: {quantity_lots} лот ({quantity_shares} шт)",
-        "",
-        f"🛑 Stop-Loss: <b>{validation.sl_price:,.2f} ₽</b>",
-        f"🎯 Take-Profit: <b>{validation.tp_price:,.2f} ₽</b>",
-        "",
-        f"💸 Риск: <b>{validation.risk_rub:,.0f} ₽</b> ({validation.risk_pct:.2f}%)",
-        f"💰 Потенц. прибыль: {validation.reward_rub:,.0f} ₽",
-        f"📊 R:R = 1:{validation.risk_reward_ratio:.1f}",
-        f"💼 Размер позиции: {validation.position_value:,.0f} ₽",
-    ]
+    msg = _CONFIRM_TEMPLATE.format(
+        ticker=ticker,
+        entry_price=entry_price,
+        quantity_lots=quantity_lots,
+        quantity_shares=quantity_lots * lot_size,
+        v=validation,
+    )
     
     if validation.warnings:
-        lines.append("")
-        lines.extend(validation.warnings)
+        msg += "\n\n" + "\n".join(validation.warnings)
     
-    return "\n".join(lines)
+    return msg
 
 
 def format_error_message(ticker: str, validation: ValidationResult) -> str:
     """Форматирует сообщение об ошибке."""
-    lines = [
-        f"❌ <b>Заявка отклонена: {ticker}</b>",
-        "",
-    ]
-    lines.extend(validation.errors)
-    return "\n".join(lines)
+    return _ERROR_TEMPLATE.format(ticker=ticker) + "".join(
+        "\n" + error for error in validation.errors
+    )
@@ -4,7 +4,8 @@
 Логика:
 1. При старте загружает pending заявки из БД
 2. Перед любым действием проверяет is_active (kill switch)
-3. Следит за стоп-заявками каждые 5 сек
+3. Следит за стоп-заявками: стрим сделок будит проверку сразу после
+   исполнения, REST-опрос каждые 5 сек — только пока стрим недоступен
 4. Когда заявка исполнена → выставляем SL и TP (если mode=auto)
 5. Сохраняет все изменения в БД
 
@@ -19,10 +20,22 @@
 import asyncio
 from dataclasses import dataclass
 from datetime import datetime
-from typing import Dict, Any, Optional, Set, Callable, TYPE_CHECKING
+from decimal import Decimal
+from typing import Dict, Any, List, Optional, Set, Tuple, Callable, TYPE_CHECKING
 from enum import Enum
 
 import structlog
+from grpc import StatusCode
+from grpc.aio import UsageError
+from t_tech.invest import (
+    OrderDirection,
+    OrderType as TinkoffOrderType,
+    StopOrderDirection,
+    StopOrderType,
+    StopOrderExpirationType,
+)
+from t_tech.invest.exceptions import AioRequestError
+from t_tech.invest.utils import decimal_to_quotation, quotation_to_decimal
 
 from db.repository import Repository
 
@@ -34,6 +47,63 @@ if TYPE_CHECKING:
 logger = structlog.get_logger()
 
 
+def _is_transport_error(e: Exception) -> bool:
+    """
+    Ошибка канала (а не бизнес-ошибка API): только после неё
+    общий клиент пересоздаётся.
+    """
+    if isinstance(e, AioRequestError):
+        return e.code == StatusCode.UNAVAILABLE
+    return isinstance(e, UsageError)  # канал уже закрыт
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# ШАБЛОНЫ УВЕДОМЛЕНИЙ (собираются через format_map)
+# ═══════════════════════════════════════════════════════════════════════════════
+
+_ENTRY_TEMPLATE = (
+    "✅ <b>Позиция открыта!</b>\n"
+    "📌 {ticker}\n"
+    "💰 Цена входа: {entry:,.2f} ₽\n"
+    "📦 Кол-во: {quantity} лот(ов)\n"
+    "\n"
+    "🛑 SL: {sl_price:,.2f} ₽ ({sl_pct:.2f}%)\n"
+    "🎯 TP: {tp_price:,.2f} ₽ ({tp_pct:.2f}%)\n"
+    "\n"
+    "💸 Макс. убыток: {potential_loss:,.0f} ₽\n"
+    "💰 Потенц. прибыль: {potential_profit:,.0f} ₽"
+)
+
+_MANUAL_MODE_TEMPLATE = (
+    "\n"
+    "⚠️ <b>Режим: {mode}</b>\n"
+    "SL и TP НЕ выставлены автоматически.\n"
+    "Выставите вручную или переключите режим: /auto"
+)
+
+_SL_FAILED_TEMPLATE = (
+    "\n"
+    "🚨 <b>КРИТИЧЕСКАЯ ОШИБКА!</b>\n"
+    "❌ SL НЕ ВЫСТАВЛЕН: {error:.100}\n"
+    "⏳ Аварийное закрытие через {timeout} сек..."
+)
+
+_SL_TP_PLACED = "\n🎯 <b>SL и TP выставлены!</b>"
+_SL_ONLY_PLACED = "\n⚠️ <b>Только SL выставлен!</b>"
+_TP_FAILED_TEMPLATE = "❌ TP НЕ выставлен: {error:.200} — выставьте вручную"
+
+_EXIT_TEMPLATE = (
+    "{title}\n"
+    "📌 {ticker}\n"
+    "💰 Вход: {entry:,.2f} ₽\n"
+    "📤 Выход: {exit:,.2f} ₽\n"
+    "📦 Кол-во: {quantity} лот(ов)\n"
+    "{pnl_icon} P&L: <b>{pnl_rub:+,.0f} ₽</b> ({pnl_pct:+.2f}%)"
+)
+
+_RELATED_CANCELLED_TEMPLATE = "🗑 Связанная {kind} заявка отменена"
+
+
 # ═══════════════════════════════════════════════════════════════════════════════
 # SL PLACEMENT GUARD — защита от "голой позиции"
 # ═══════════════════════════════════════════════════════════════════════════════
@@ -152,9 +222,9 @@ class OrderType(Enum):
     TAKE_PROFIT = "take_profit"   # Тейк-профит на продажу
 
 
-@dataclass
+@dataclass(slots=True)
 class TrackedOrder:
-    """Отслеживаемая заявка (in-memory представление)."""
+    """Отслеживаемая заявка (in-memory представление, без __dict__)."""
     order_id: str
     ticker: str
     figi: str
@@ -213,6 +283,12 @@ class PositionWatcher:
     # Таймаут на выставление SL (секунды)
     SL_PLACEMENT_TIMEOUT = 10
 
+    # Сверка через REST при живом стриме (отмены на бирже в стрим сделок не попадают)
+    STREAM_RECONCILE_INTERVAL = 60
+
+    # Максимальная пауза перед переподключением стрима (секунды)
+    STREAM_MAX_BACKOFF = 60
+
     def __init__(
         self, 
         config: "Config", 
@@ -224,14 +300,28 @@ class PositionWatcher:
         self.repo = repository
         self.notifier = notifier
         self.poll_interval = poll_interval
+        self._account_id = config.tinkoff.account_id
         
         self._running = False
         self._tracked_orders: Dict[str, TrackedOrder] = {}
-        self._executed_orders: Set[str] = set()
+        
+        # Индекс (ticker, тип) → order_id для поиска связанной SL/TP без
+        # перебора всех заявок; по тикеру может быть несколько позиций
+        self._by_ticker_type: Dict[Tuple[str, OrderType], Set[str]] = {}
         
         # Защита от "голой позиции"
         self._sl_guard = SLPlacementGuard(timeout_sec=self.SL_PLACEMENT_TIMEOUT)
         
+        # Стрим сделок: пока подключён — опрос не нужен, будим цикл по событию.
+        # _wake также взводят track_order (новая заявка) и stop()
+        self._stream_task: Optional[asyncio.Task] = None
+        self._stream_connected = False
+        self._wake = asyncio.Event()
+        
+        # Долгоживущий клиент для опроса, SL/TP и отмен (аварийное закрытие — свой)
+        self._client: Optional["TinkoffClient"] = None
+        self._client_lock = asyncio.Lock()
+        
         self.logger = logger.bind(component="position_watcher")
 
     # ═══════════════════════════════════════════════════════════════════════════
@@ -290,7 +380,7 @@ class PositionWatcher:
                     tp_order_id=order_db.tp_order_id,
                     created_by=order_db.created_by,
                 )
-                self._tracked_orders[order.order_id] = order
+                self._add_tracked(order)
             
             self.logger.info("pending_orders_loaded", count=len(pending))
             
@@ -351,8 +441,9 @@ class PositionWatcher:
             created_by=created_by,
         )
         
-        # Сохраняем в память
-        self._tracked_orders[order_id] = order
+        # Сохраняем в память и будим цикл проверки
+        self._add_tracked(order)
+        self._wake.set()
         
         # Сохраняем в БД
         try:
@@ -383,8 +474,7 @@ class PositionWatcher:
 
     async def untrack_order(self, order_id: str, reason: str = "manual"):
         """Удаляет заявку из отслеживания."""
-        if order_id in self._tracked_orders:
-            del self._tracked_orders[order_id]
+        self._drop_tracked(order_id)
         
         # Обновляем статус в БД
         try:
@@ -394,6 +484,42 @@ class PositionWatcher:
         
         self.logger.info("order_untracked", order_id=order_id, reason=reason)
 
+    def _add_tracked(self, order: TrackedOrder):
+        """Добавляет заявку в in-memory кэш и индекс (ticker, тип)."""
+        self._tracked_orders[order.order_id] = order
+        self._by_ticker_type.setdefault(
+            (order.ticker, order.order_type), set()
+        ).add(order.order_id)
+
+    def _drop_tracked(self, order_id: str):
+        """Убирает заявку из in-memory кэша и индекса."""
+        order = self._tracked_orders.pop(order_id, None)
+        if order is None:
+            return
+        key = (order.ticker, order.order_type)
+        ids = self._by_ticker_type.get(key)
+        if ids is not None:
+            ids.discard(order_id)
+            if not ids:
+                del self._by_ticker_type[key]
+
+    def _find_related(
+        self, tracked: TrackedOrder, target_type: OrderType
+    ) -> Optional[TrackedOrder]:
+        """
+        Ищет неисполненную парную SL/TP той же позиции по индексу.
+
+        Пара — заявка того же тикера с тем же parent_order_id (entry):
+        ногу другой позиции по этому тикеру не трогаем.
+        """
+        for order_id in self._by_ticker_type.get((tracked.ticker, target_type), ()):
+            order = self._tracked_orders.get(order_id)
+            if (order is not None
+                    and not order.is_executed
+                    and order.parent_order_id == tracked.parent_order_id):
+                return order
+        return None
+
     # ═══════════════════════════════════════════════════════════════════════════
     # MAIN LOOP
     # ═══════════════════════════════════════════════════════════════════════════
@@ -406,6 +532,9 @@ class PositionWatcher:
         # Загружаем pending заявки из БД
         await self.load_pending_orders()
         
+        # Подписка на сделки — основной источник исполнений
+        self._stream_task = asyncio.create_task(self._run_stream())
+        
         consecutive_errors = 0
         max_consecutive_errors = 5
         
@@ -441,15 +570,20 @@ class PositionWatcher:
                     consecutive_errors = 0
                     continue
             
-            await asyncio.sleep(self.poll_interval)
+            await self._wait_next_check()
         
         # Cleanup при остановке
+        self._cancel_stream()
+        await self._close_client()
         self._sl_guard.cancel_all()
         self.logger.info("position_watcher_stopped")
 
     async def stop(self):
         """Останавливает мониторинг."""
         self._running = False
+        self._wake.set()  # выводим цикл из ожидания
+        self._cancel_stream()
+        await self._close_client()
         self._sl_guard.cancel_all()
         self.logger.info("position_watcher_stop_requested")
 
@@ -464,99 +598,214 @@ class PositionWatcher:
     def get_tracked_orders(self) -> Dict[str, TrackedOrder]:
         return self._tracked_orders.copy()
 
+    # ═══════════════════════════════════════════════════════════════════════════
+    # TRADES STREAM
+    # ═══════════════════════════════════════════════════════════════════════════
+
+    async def _run_stream(self):
+        """
+        Слушает стрим сделок по счёту и будит цикл проверки.
+        
+        order_id в OrderTrades — биржевая заявка, порождённая стоп-заявкой,
+        а не stop_order_id. Поэтому сопоставляем по figi и сразу запускаем
+        _check_orders: статус и цена исполнения берутся оттуда.
+        
+        При обрыве — переподключение с экспоненциальной паузой,
+        на это время цикл возвращается к опросу каждые poll_interval.
+        """
+        # Импорт здесь чтобы избежать circular import
+        from api.tinkoff_client import TinkoffClient
+        
+        attempt = 0
+        
+        while self._running:
+            try:
+                async with TinkoffClient(self.config.tinkoff) as client:
+                    stream = client._services.orders_stream.trades_stream(
+                        accounts=[self._account_id]
+                    )
+                    async for response in stream:
+                        if not self._stream_connected:
+                            self._stream_connected = True
+                            attempt = 0
+                            self.logger.info("trades_stream_connected")
+                        
+                        trades = response.order_trades
+                        if not trades:
+                            continue  # ping / подтверждение подписки
+                        
+                        if any(t.figi == trades.figi for t in self._tracked_orders.values()):
+                            self.logger.info("trades_stream_fill",
+                                           figi=trades.figi,
+                                           order_id=trades.order_id)
+                            self._wake.set()
+                            
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.logger.warning("trades_stream_error", error=str(e))
+            
+            if self._stream_connected:
+                self._stream_connected = False
+                self._wake.set()  # сразу переключаем цикл на опрос
+            
+            attempt += 1
+            delay = min(2 ** attempt, self.STREAM_MAX_BACKOFF)
+            self.logger.warning("trades_stream_reconnecting", attempt=attempt, wait_seconds=delay)
+            await asyncio.sleep(delay)
+
+    async def _wait_next_check(self):
+        """
+        Ждёт следующей проверки заявок.
+        
+        Нет заявок → спим до track_order / stop, без пробуждений по таймеру.
+        Стрим подключён → просыпаемся по сделке или раз в STREAM_RECONCILE_INTERVAL.
+        Стрим недоступен → обычный опрос каждые poll_interval.
+        """
+        if not self._tracked_orders:
+            await self._wake.wait()
+        else:
+            timeout = self.STREAM_RECONCILE_INTERVAL if self._stream_connected else self.poll_interval
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=timeout)
+            except asyncio.TimeoutError:
+                pass
+        self._wake.clear()
+
+    def _cancel_stream(self):
+        """Останавливает стрим сделок."""
+        if self._stream_task:
+            self._stream_task.cancel()
+            self._stream_task = None
+        self._stream_connected = False
+
+    # ═══════════════════════════════════════════════════════════════════════════
+    # TINKOFF CLIENT
+    # ═══════════════════════════════════════════════════════════════════════════
+
+    async def _get_client(self) -> "TinkoffClient":
+        """Возвращает открытый клиент, при необходимости подключается."""
+        if self._client is None:
+            # Импорт здесь чтобы избежать circular import
+            from api.tinkoff_client import TinkoffClient
+            
+            # Lock: опрос и отмена связанной заявки могут подключаться одновременно
+            async with self._client_lock:
+                if self._client is None:
+                    self._client = await TinkoffClient(self.config.tinkoff).__aenter__()
+        return self._client
+
+    async def _close_client(self):
+        """Закрывает клиент (следующий _get_client переподключится)."""
+        client, self._client = self._client, None
+        if client is None:
+            return
+        try:
+            await client.__aexit__(None, None, None)
+        except Exception as e:
+            self.logger.warning("tinkoff_client_close_error", error=str(e))
+
     # ═══════════════════════════════════════════════════════════════════════════
     # ORDER CHECKING
     # ═══════════════════════════════════════════════════════════════════════════
 
     async def _check_orders(self):
-        """Проверяет статус всех отслеживаемых заявок."""
+        """
+        Проверяет статус всех отслеживаемых заявок.
+        
+        Стоп-заявки и портфель запрашиваются параллельно один раз за тик —
+        обработка отдельных заявок дополнительных запросов не делает.
+        """
         if not self._tracked_orders:
             return
         
         self.logger.debug("checking_orders", count=len(self._tracked_orders))
         
-        # Импорт здесь чтобы избежать circular import
-        from api.tinkoff_client import TinkoffClient
-        
         try:
-            async with TinkoffClient(self.config.tinkoff) as client:
-                services = client._services
-                response = await services.stop_orders.get_stop_orders(
-                    account_id=self.config.tinkoff.account_id
-                )
-                
-                current_orders = {
-                    order.stop_order_id: order 
-                    for order in response.stop_orders
-                }
-                
-                for order_id, tracked in list(self._tracked_orders.items()):
-                    # Проверяем kill switch перед каждой заявкой
-                    if not await self._check_bot_active():
-                        self.logger.info("check_orders_interrupted_inactive")
-                        return
-                    
-                    try:
-                        await self._process_order(client, order_id, tracked, current_orders)
-                    except Exception as e:
-                        self.logger.exception("process_order_error", 
-                                            order_id=order_id, 
-                                            error=str(e))
-                        
+            client = await self._get_client()
+            services = client._services
+            response, portfolio = await asyncio.gather(
+                services.stop_orders.get_stop_orders(account_id=self._account_id),
+                services.operations.get_portfolio(account_id=self._account_id),
+            )
         except Exception as e:
             self.logger.error("check_orders_api_error", error=str(e))
+            # Канал умер — переподключимся на следующем тике
+            if _is_transport_error(e):
+                await self._close_client()
+            return
+        
+        current_orders = {
+            order.stop_order_id: order 
+            for order in response.stop_orders
+        }
+        positions_by_figi = {pos.figi: pos for pos in portfolio.positions}
+        # Время исполнения — одно на тик
+        now = datetime.utcnow()
+        
+        for order_id, tracked in list(self._tracked_orders.items()):
+            # Проверяем kill switch перед каждой заявкой
+            if not await self._check_bot_active():
+                self.logger.info("check_orders_interrupted_inactive")
+                return
+            
+            try:
+                await self._process_order(
+                    order_id, tracked, current_orders, positions_by_figi, now
+                )
+            except Exception as e:
+                self.logger.exception("process_order_error", 
+                                    order_id=order_id, 
+                                    error=str(e))
 
     async def _process_order(
         self, 
-        client,
         order_id: str, 
         tracked: TrackedOrder, 
-        current_orders: Dict
+        current_orders: Dict,
+        positions_by_figi: Dict[str, Any],
+        now: datetime
     ):
         """Обрабатывает одну заявку."""
-        if order_id in self._executed_orders:
+        if tracked.is_executed:
             return
         
         api_order = current_orders.get(order_id)
         
         if api_order is None:
-            await self._handle_missing_order(client, tracked)
+            await self._handle_missing_order(tracked, positions_by_figi, now)
             return
         
         status = api_order.status.name
         
         if status == "STOP_ORDER_STATUS_EXECUTED":
-            await self._handle_executed_order(client, tracked, api_order)
+            await self._handle_executed_order(tracked, api_order, now)
         elif status == "STOP_ORDER_STATUS_CANCELLED":
             await self._handle_cancelled_order(tracked)
 
-    async def _handle_missing_order(self, client, tracked: TrackedOrder):
-        """Обрабатывает исчезнувшую заявку."""
+    async def _handle_missing_order(
+        self,
+        tracked: TrackedOrder,
+        positions_by_figi: Dict[str, Any],
+        now: datetime
+    ):
+        """Обрабатывает исчезнувшую заявку (позиция — из снимка портфеля тика)."""
         self.logger.info("order_missing", order_id=tracked.order_id, ticker=tracked.ticker)
         
-        # Проверяем позицию
-        services = client._services
-        portfolio = await services.operations.get_portfolio(
-            account_id=self.config.tinkoff.account_id
-        )
-        
         has_position = False
         executed_price = 0
         
-        for pos in portfolio.positions:
-            if pos.figi == tracked.figi:
-                from t_tech.invest.utils import quotation_to_decimal
-                qty = float(quotation_to_decimal(pos.quantity))
-                if qty > 0:
-                    has_position = True
-                    executed_price = float(quotation_to_decimal(pos.average_position_price))
-                    break
+        pos = positions_by_figi.get(tracked.figi)
+        if pos is not None:
+            qty = float(quotation_to_decimal(pos.quantity))
+            if qty > 0:
+                has_position = True
+                executed_price = float(quotation_to_decimal(pos.average_position_price))
         
         if has_position and tracked.order_type == OrderType.ENTRY_BUY:
             tracked.is_executed = True
             tracked.executed_price = executed_price
-            tracked.executed_at = datetime.utcnow()
-            self._executed_orders.add(tracked.order_id)
+            tracked.executed_at = now
             
             # Обновляем в БД
             await self.repo.mark_order_executed(
@@ -565,20 +814,22 @@ class PositionWatcher:
                 execution_reason="filled"
             )
             
-            await self._on_entry_executed(client, tracked, executed_price)
+            await self._on_entry_executed(tracked, executed_price)
         else:
             await self._handle_cancelled_order(tracked)
 
-    async def _handle_executed_order(self, client, tracked: TrackedOrder, api_order):
+    async def _handle_executed_order(
+        self,
+        tracked: TrackedOrder,
+        api_order,
+        now: datetime
+    ):
         """Обрабатывает исполненную заявку."""
-        from t_tech.invest.utils import quotation_to_decimal
-        
         executed_price = float(quotation_to_decimal(api_order.stop_price))
         
         tracked.is_executed = True
         tracked.executed_price = executed_price
-        tracked.executed_at = datetime.utcnow()
-        self._executed_orders.add(tracked.order_id)
+        tracked.executed_at = now
         
         self.logger.info("order_executed",
                         order_id=tracked.order_id,
@@ -593,7 +844,7 @@ class PositionWatcher:
                 executed_price=executed_price,
                 execution_reason="filled"
             )
-            await self._on_entry_executed(client, tracked, executed_price)
+            await self._on_entry_executed(tracked, executed_price)
             
         elif tracked.order_type == OrderType.STOP_LOSS:
             pnl = self._calculate_pnl(tracked, executed_price)
@@ -642,7 +893,7 @@ class PositionWatcher:
     # ENTRY EXECUTION
     # ═══════════════════════════════════════════════════════════════════════════
 
-    async def _on_entry_executed(self, client, tracked: TrackedOrder, executed_price: float):
+    async def _on_entry_executed(self, tracked: TrackedOrder, executed_price: float):
         """
         Заявка на ВХОД исполнена.
         
@@ -666,28 +917,25 @@ class PositionWatcher:
         potential_loss = tracked.stop_offset * tracked.quantity * tracked.lot_size
         potential_profit = tracked.take_offset * tracked.quantity * tracked.lot_size
         
-        # Уведомляем о входе
-        await self.notifier.send_message(
-            f"✅ <b>Позиция открыта!</b>\n"
-            f"📌 {tracked.ticker}\n"
-            f"💰 Цена входа: {executed_price:,.2f} ₽\n"
-            f"📦 Кол-во: {tracked.quantity} лот(ов)\n\n"
-            f"🛑 SL: {sl_price:,.2f} ₽ ({sl_pct:.2f}%)\n"
-            f"🎯 TP: {tp_price:,.2f} ₽ ({tp_pct:.2f}%)\n\n"
-            f"💸 Макс. убыток: {potential_loss:,.0f} ₽\n"
-            f"💰 Потенц. прибыль: {potential_profit:,.0f} ₽"
-        )
+        # Одно уведомление на вход: параметры позиции + итог выставления SL/TP
+        lines = [_ENTRY_TEMPLATE.format_map({
+            "ticker": tracked.ticker,
+            "entry": executed_price,
+            "quantity": tracked.quantity,
+            "sl_price": sl_price,
+            "sl_pct": sl_pct,
+            "tp_price": tp_price,
+            "tp_pct": tp_pct,
+            "potential_loss": potential_loss,
+            "potential_profit": potential_profit,
+        })]
         
         # Если режим manual — не выставляем заявки
         if mode != "auto":
-            await self.notifier.send_message(
-                f"⚠️ <b>Режим: {mode.upper()}</b>\n"
-                f"SL и TP НЕ выставлены автоматически.\n"
-                f"Выставите вручную или переключите режим: /auto"
-            )
+            lines.append(_MANUAL_MODE_TEMPLATE.format_map({"mode": mode.upper()}))
+            await self.notifier.send_message("\n".join(lines))
             # Удаляем из отслеживания (позиция открыта, но без автоматики)
-            if tracked.order_id in self._tracked_orders:
-                del self._tracked_orders[tracked.order_id]
+            self._drop_tracked(tracked.order_id)
             return
         
         # ═══════════════════════════════════════════════════════════════════════
@@ -703,8 +951,11 @@ class PositionWatcher:
             executed_price=executed_price
         )
         
-        # Выставляем SL и TP
-        await self._place_sl_tp(client, tracked, executed_price, sl_price, tp_price)
+        # Выставляем SL и TP (уведомление уйдёт даже при сбое)
+        try:
+            lines += await self._place_sl_tp(tracked, executed_price, sl_price, tp_price)
+        finally:
+            await self.notifier.send_message("\n".join(lines))
 
     # ═══════════════════════════════════════════════════════════════════════════
     # SL/TP PLACEMENT
@@ -712,42 +963,68 @@ class PositionWatcher:
 
     async def _place_sl_tp(
         self, 
-        client, 
         tracked: TrackedOrder, 
         executed_price: float,
         sl_price: float,
         tp_price: float
-    ):
+    ) -> List[str]:
         """
         Выставляет SL и TP заявки.
         
         ⚠️ ВАЖНО: При успешном выставлении SL вызывает sl_guard.sl_placed()
         чтобы отменить защитный таймер.
-        """
-        from decimal import Decimal
-        from t_tech.invest.utils import decimal_to_quotation
-        from t_tech.invest import (
-            StopOrderDirection,
-            StopOrderType,
-            StopOrderExpirationType,
-        )
         
-        services = client._services
+        Обе заявки отправляются одновременно: позиция без защиты
+        max(RTT_SL, RTT_TP), а не RTT_SL + RTT_TP.
+        
+        Returns:
+            Строки с итогом для уведомления о входе
+        """
         sl_success = False
         tp_success = False
+        tp_error = ""
+        lines: List[str] = []
         
-        # === STOP-LOSS (критически важен!) ===
         try:
-            sl_response = await services.stop_orders.post_stop_order(
-                figi=tracked.figi,
-                quantity=tracked.quantity,
-                stop_price=decimal_to_quotation(Decimal(str(sl_price))),
-                direction=StopOrderDirection.STOP_ORDER_DIRECTION_SELL,
-                account_id=self.config.tinkoff.account_id,
-                stop_order_type=StopOrderType.STOP_ORDER_TYPE_STOP_LOSS,
-                expiration_type=StopOrderExpirationType.STOP_ORDER_EXPIRATION_TYPE_GOOD_TILL_CANCEL,
+            client = await self._get_client()
+        except Exception as e:
+            # Переподключение не удалось — заявки не отправлены; дальше как
+            # при сбое обеих (таймер SL уже запущен и закроет позицию)
+            self.logger.exception("sl_tp_connect_error", error=str(e))
+            sl_result = tp_result = e
+        else:
+            services = client._services
+            sl_result, tp_result = await asyncio.gather(
+                services.stop_orders.post_stop_order(
+                    figi=tracked.figi,
+                    quantity=tracked.quantity,
+                    stop_price=decimal_to_quotation(Decimal(str(sl_price))),
+                    direction=StopOrderDirection.STOP_ORDER_DIRECTION_SELL,
+                    account_id=self._account_id,
+                    stop_order_type=StopOrderType.STOP_ORDER_TYPE_STOP_LOSS,
+                    expiration_type=StopOrderExpirationType.STOP_ORDER_EXPIRATION_TYPE_GOOD_TILL_CANCEL,
+                ),
+                services.stop_orders.post_stop_order(
+                    figi=tracked.figi,
+                    quantity=tracked.quantity,
+                    stop_price=decimal_to_quotation(Decimal(str(tp_price))),
+                    direction=StopOrderDirection.STOP_ORDER_DIRECTION_SELL,
+                    account_id=self._account_id,
+                    stop_order_type=StopOrderType.STOP_ORDER_TYPE_TAKE_PROFIT,
+                    expiration_type=StopOrderExpirationType.STOP_ORDER_EXPIRATION_TYPE_GOOD_TILL_CANCEL,
+                ),
+                return_exceptions=True,
             )
             
+            if any(isinstance(r, Exception) and _is_transport_error(r) for r in (sl_result, tp_result)):
+                await self._close_client()
+        
+        # === STOP-LOSS (критически важен!) ===
+        try:
+            if isinstance(sl_result, BaseException):
+                raise sl_result
+            sl_response = sl_result
+            
             tracked.sl_order_id = sl_response.stop_order_id
             sl_success = True
             
@@ -785,25 +1062,17 @@ class PositionWatcher:
             # ❌ SL НЕ выставлен!
             # Защитный таймер продолжает тикать и вызовет аварийное закрытие
             self.logger.exception("stop_loss_error", error=str(e))
-            await self.notifier.send_message(
-                f"🚨 <b>КРИТИЧЕСКАЯ ОШИБКА!</b>\n"
-                f"📌 {tracked.ticker}\n"
-                f"❌ SL НЕ ВЫСТАВЛЕН: {str(e)[:100]}\n\n"
-                f"⏳ Аварийное закрытие через {self.SL_PLACEMENT_TIMEOUT} сек..."
-            )
-            # НЕ возвращаемся — пробуем TP, но таймер уже тикает
+            lines.append(_SL_FAILED_TEMPLATE.format_map({
+                "error": str(e),
+                "timeout": self.SL_PLACEMENT_TIMEOUT,
+            }))
+            # НЕ возвращаемся — TP обрабатываем, но таймер уже тикает
         
         # === TAKE-PROFIT (менее критичен) ===
         try:
-            tp_response = await services.stop_orders.post_stop_order(
-                figi=tracked.figi,
-                quantity=tracked.quantity,
-                stop_price=decimal_to_quotation(Decimal(str(tp_price))),
-                direction=StopOrderDirection.STOP_ORDER_DIRECTION_SELL,
-                account_id=self.config.tinkoff.account_id,
-                stop_order_type=StopOrderType.STOP_ORDER_TYPE_TAKE_PROFIT,
-                expiration_type=StopOrderExpirationType.STOP_ORDER_EXPIRATION_TYPE_GOOD_TILL_CANCEL,
-            )
+            if isinstance(tp_result, BaseException):
+                raise tp_result
+            tp_response = tp_result
             
             tracked.tp_order_id = tp_response.stop_order_id
             tp_success = True
@@ -837,7 +1106,15 @@ class PositionWatcher:
             
         except Exception as e:
             self.logger.exception("take_profit_error", error=str(e))
-            await self.notifier.send_error(f"TP не выставлен: {str(e)}", tracked.ticker)
+            tp_error = str(e)
+        
+        # Связываем SL и TP между собой, чтобы при срабатывании одной
+        # отменить другую без поиска
+        sl_tracked = self._tracked_orders.get(tracked.sl_order_id) if tracked.sl_order_id else None
+        tp_tracked = self._tracked_orders.get(tracked.tp_order_id) if tracked.tp_order_id else None
+        if sl_tracked and tp_tracked:
+            sl_tracked.tp_order_id = tp_tracked.order_id
+            tp_tracked.sl_order_id = sl_tracked.order_id
         
         # Связываем заявки в БД
         if tracked.sl_order_id or tracked.tp_order_id:
@@ -847,27 +1124,17 @@ class PositionWatcher:
                 tp_order_id=tracked.tp_order_id
             )
         
-        # Итоговое уведомление (только если SL успешно)
+        # Итог (если SL не выставлен — таймер сработает и вызовет аварийное закрытие)
         if sl_success:
-            if tp_success:
-                await self.notifier.send_message(
-                    f"🎯 <b>SL и TP выставлены!</b>\n"
-                    f"📌 {tracked.ticker}\n"
-                    f"🛑 SL: {sl_price:,.2f} ₽\n"
-                    f"🎯 TP: {tp_price:,.2f} ₽"
-                )
-            else:
-                await self.notifier.send_message(
-                    f"⚠️ <b>Только SL выставлен!</b>\n"
-                    f"📌 {tracked.ticker}\n"
-                    f"🛑 SL: {sl_price:,.2f} ₽\n"
-                    f"❌ TP НЕ выставлен — выставьте вручную"
-                )
-        # Если SL не выставлен — таймер сработает и вызовет аварийное закрытие
+            lines.append(_SL_TP_PLACED if tp_success else _SL_ONLY_PLACED)
+        if not tp_success:
+            lines.append(_TP_FAILED_TEMPLATE.format_map({"error": tp_error}))
         
         # Удаляем entry из отслеживания (если SL выставлен)
-        if sl_success and tracked.order_id in self._tracked_orders:
-            del self._tracked_orders[tracked.order_id]
+        if sl_success:
+            self._drop_tracked(tracked.order_id)
+        
+        return lines
 
     # ═══════════════════════════════════════════════════════════════════════════
     # EMERGENCY CLOSE — аварийное закрытие при сбое SL
@@ -906,7 +1173,8 @@ class PositionWatcher:
             f"🔄 Закрываю позицию по маркету..."
         )
         
-        # Импорт здесь чтобы избежать circular import
+        # Отдельный клиент: аварийное закрытие не должно зависеть от общего
+        # канала, который в это же время может использовать (или закрыть) опрос
         from api.tinkoff_client import TinkoffClient
         
         try:
@@ -914,16 +1182,11 @@ class PositionWatcher:
                 services = client._services
                 
                 # Закрываем по маркету
-                from t_tech.invest import (
-                    OrderDirection,
-                    OrderType as TinkoffOrderType,
-                )
-                
                 response = await services.orders.post_order(
                     figi=tracked.figi,
                     quantity=tracked.quantity,
                     direction=OrderDirection.ORDER_DIRECTION_SELL,
-                    account_id=self.config.tinkoff.account_id,
+                    account_id=self._account_id,
                     order_type=TinkoffOrderType.ORDER_TYPE_MARKET,
                 )
                 
@@ -960,10 +1223,9 @@ class PositionWatcher:
             )
         
         # Очищаем отслеживание
-        if tracked.order_id in self._tracked_orders:
-            del self._tracked_orders[tracked.order_id]
-        if tracked.tp_order_id and tracked.tp_order_id in self._tracked_orders:
-            del self._tracked_orders[tracked.tp_order_id]
+        self._drop_tracked(tracked.order_id)
+        if tracked.tp_order_id:
+            self._drop_tracked(tracked.tp_order_id)
 
     # ═══════════════════════════════════════════════════════════════════════════
     # SL/TP EXECUTION HANDLERS
@@ -973,72 +1235,80 @@ class PositionWatcher:
         """Стоп-лосс сработал."""
         pnl = self._calculate_pnl(tracked, executed_price)
         
-        await self.notifier.send_message(
-            f"🛑 <b>СТОП-ЛОСС сработал!</b>\n"
-            f"📌 {tracked.ticker}\n"
-            f"💰 Вход: {tracked.entry_price:,.2f} ₽\n"
-            f"📤 Выход: {executed_price:,.2f} ₽\n"
-            f"📦 Кол-во: {tracked.quantity} лот(ов)\n"
-            f"💸 P&L: <b>{pnl['pnl_rub']:+,.0f} ₽</b> ({pnl['pnl_pct']:+.2f}%)"
-        )
+        lines = [_EXIT_TEMPLATE.format_map({
+            "title": "🛑 <b>СТОП-ЛОСС сработал!</b>",
+            "ticker": tracked.ticker,
+            "entry": tracked.entry_price,
+            "exit": executed_price,
+            "quantity": tracked.quantity,
+            "pnl_icon": "💸",
+            **pnl,
+        })]
+        
+        if await self._cancel_related_order(tracked, "tp"):
+            lines.append(_RELATED_CANCELLED_TEMPLATE.format_map({"kind": "TP"}))
         
-        await self._cancel_related_order(tracked, "tp")
+        await self.notifier.send_message("\n".join(lines))
         
-        if tracked.order_id in self._tracked_orders:
-            del self._tracked_orders[tracked.order_id]
+        self._drop_tracked(tracked.order_id)
 
     async def _on_take_profit_executed(self, tracked: TrackedOrder, executed_price: float):
         """Тейк-профит сработал."""
         pnl = self._calculate_pnl(tracked, executed_price)
         
-        await self.notifier.send_message(
-            f"🎯 <b>ТЕЙК-ПРОФИТ сработал!</b>\n"
-            f"📌 {tracked.ticker}\n"
-            f"💰 Вход: {tracked.entry_price:,.2f} ₽\n"
-            f"📤 Выход: {executed_price:,.2f} ₽\n"
-            f"📦 Кол-во: {tracked.quantity} лот(ов)\n"
-            f"💰 P&L: <b>{pnl['pnl_rub']:+,.0f} ₽</b> ({pnl['pnl_pct']:+.2f}%)"
-        )
+        lines = [_EXIT_TEMPLATE.format_map({
+            "title": "🎯 <b>ТЕЙК-ПРОФИТ сработал!</b>",
+            "ticker": tracked.ticker,
+            "entry": tracked.entry_price,
+            "exit": executed_price,
+            "quantity": tracked.quantity,
+            "pnl_icon": "💰",
+            **pnl,
+        })]
         
-        await self._cancel_related_order(tracked, "sl")
+        if await self._cancel_related_order(tracked, "sl"):
+            lines.append(_RELATED_CANCELLED_TEMPLATE.format_map({"kind": "SL"}))
         
-        if tracked.order_id in self._tracked_orders:
-            del self._tracked_orders[tracked.order_id]
-
-    async def _cancel_related_order(self, tracked: TrackedOrder, order_type: str):
-        """Отменяет связанную заявку (SL или TP)."""
-        from api.tinkoff_client import TinkoffClient
+        await self.notifier.send_message("\n".join(lines))
         
-        target_type = OrderType.TAKE_PROFIT if order_type == "tp" else OrderType.STOP_LOSS
-        related_order_id = None
-        
-        for oid, order in list(self._tracked_orders.items()):
-            if (order.ticker == tracked.ticker and 
-                order.order_type == target_type and 
-                not order.is_executed):
-                related_order_id = oid
-                break
+        self._drop_tracked(tracked.order_id)
+
+    async def _cancel_related_order(self, tracked: TrackedOrder, order_type: str) -> bool:
+        """
+        Отменяет связанную заявку (SL или TP).
         
-        if not related_order_id:
-            return
+        Returns:
+            True если заявка была отменена
+        """
+        # Связка, запомненная при выставлении (в памяти и в строках SL/TP БД),
+        # иначе — пара той же позиции по индексу (ticker, тип)
+        related_order_id = tracked.tp_order_id if order_type == "tp" else tracked.sl_order_id
+        related = self._tracked_orders.get(related_order_id) if related_order_id else None
+        if related is None or related.is_executed:
+            target_type = OrderType.TAKE_PROFIT if order_type == "tp" else OrderType.STOP_LOSS
+            related = self._find_related(tracked, target_type)
+        if related is None:
+            return False
+        related_order_id = related.order_id
         
         try:
-            async with TinkoffClient(self.config.tinkoff) as client:
-                services = client._services
-                await services.stop_orders.cancel_stop_order(
-                    account_id=self.config.tinkoff.account_id,
-                    stop_order_id=related_order_id
-                )
-                
-                self.logger.info("related_order_cancelled", 
-                               order_id=related_order_id, 
-                               type=order_type)
-                
-                await self.untrack_order(related_order_id, "opposite_triggered")
-                
-                await self.notifier.send_message(
-                    f"🗑 Связанная {order_type.upper()} заявка отменена"
-                )
-                
+            client = await self._get_client()
+            services = client._services
+            await services.stop_orders.cancel_stop_order(
+                account_id=self._account_id,
+                stop_order_id=related_order_id
+            )
+            
+            self.logger.info("related_order_cancelled", 
+                           order_id=related_order_id, 
+                           type=order_type)
+            
+            await self.untrack_order(related_order_id, "opposite_triggered")
+            return True
+            
         except Exception as e:
             self.logger.exception("cancel_related_order_error", error=str(e))
+            # Канал умер — переподключимся при следующем вызове
+            if _is_transport_error(e):
+                await self._close_client()
+            return False
@@ -23,6 +23,7 @@ Trading Bot - Стратегическая торговля на MOEX.
 ⚠️ ПРЕДУПРЕЖДЕНИЕ: Торговля на бирже несёт риск потери капитала.
 """
 import asyncio
+import logging
 import sys
 from pathlib import Path
 
@@ -41,14 +42,28 @@ from db.repository import Repository
 from scheduler.jobs import DailyCalculationJob
 from executor.position_watcher import PositionWatcher
 
-# Настройка логирования
-structlog.configure(
-    processors=[
-        structlog.processors.TimeStamper(fmt="iso"),
-        structlog.processors.add_log_level,
-        structlog.dev.ConsoleRenderer(colors=True)
-    ]
-)
+
+def configure_logging(level: int = logging.INFO, cache: bool = False):
+    """
+    Настройка логирования.
+
+    Уровень ниже level отсекается до сборки event dict (вызов — no-op).
+    До load_config логгеры не кэшируются: иначе уровень из config
+    (LOG_LEVEL, в том числе из .env) не дошёл бы до уже вызванных логгеров.
+    """
+    structlog.configure(
+        processors=[
+            structlog.processors.TimeStamper(fmt="iso"),
+            structlog.processors.add_log_level,
+            structlog.dev.ConsoleRenderer(colors=True)
+        ],
+        wrapper_class=structlog.make_filtering_bound_logger(level),
+        cache_logger_on_first_use=cache,
+    )
+
+
+# Уровень по умолчанию — до загрузки конфигурации
+configure_logging()
 logger = structlog.get_logger()
 
 MSK = pytz.timezone("Europe/Moscow")
@@ -65,6 +80,8 @@ async def main():
     try:
         config_path = Path(__file__).parent.parent / "config.yaml"
         config = load_config(str(config_path))
+        # Тот же уровень, что у гейтов _log_info в OrderManager/OrderValidator
+        configure_logging(config.log_level, cache=True)
         logger.info("config_loaded", 
                    dry_run=config.dry_run,
                    authorized_users=len(config.telegram.authorized_users))
@@ -77,7 +94,17 @@ async def main():
     # ═══════════════════════════════════════════════════════════════════════
     
     # База данных
-    repo = Repository(config.database.url)
+    db_cfg = config.database
+    repo = Repository(
+        db_cfg.url,
+        pool_size=db_cfg.pool_size,
+        max_overflow=db_cfg.max_overflow,
+        pool_pre_ping=db_cfg.pool_pre_ping,
+        pool_recycle=db_cfg.pool_recycle,
+        pool_timeout=db_cfg.pool_timeout,
+        statement_cache_size=db_cfg.statement_cache_size,
+        query_cache_size=db_cfg.query_cache_size,
+    )
     await repo.init_db()
     
     # Telegram notifier
@@ -208,7 +235,17 @@ async def main():
         logger.info("bot_stopped")
 
 
+def install_event_loop():
+    """uvloop вместо стандартного цикла asyncio (если установлен)."""
+    try:
+        import uvloop
+    except ImportError:
+        return
+    asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+
+
 if __name__ == "__main__":
+    install_event_loop()
     try:
         asyncio.run(main())
     except KeyboardInterrupt:
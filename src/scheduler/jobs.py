@@ -10,7 +10,7 @@ DailyCalculationJob: ежедневный расчёт индикаторов в
 """
 import asyncio
 from datetime import datetime, timedelta, date
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple
 
 import pytz
 import structlog
@@ -43,6 +43,9 @@ class DailyCalculationJob:
         self.repo = repository
         self.notifier = notifier
         
+        # Индикаторы акций за цикл: (share, data) — сохраняются пачкой
+        self._indicator_batch: List[Tuple[Dict[str, Any], Dict[str, Any]]] = []
+        
         # Статистика для диагностики
         self._diagnostics = {
             "total_shares": 0,
@@ -52,6 +55,7 @@ class DailyCalculationJob:
             "spread_failed": 0,
             "indicators_ok": 0,
             "indicators_failed": 0,
+            "indicators_save_failed": 0,
             "insufficient_days": 0,
             "no_candles": 0,
             "errors": [],
@@ -67,6 +71,7 @@ class DailyCalculationJob:
             "spread_failed": 0,
             "indicators_ok": 0,
             "indicators_failed": 0,
+            "indicators_save_failed": 0,
             "insufficient_days": 0,
             "no_candles": 0,
             "errors": [],
@@ -76,6 +81,7 @@ class DailyCalculationJob:
         """Запускает ежедневный расчёт."""
         logger.info("daily_calculation_started")
         self._reset_diagnostics()
+        self._indicator_batch = []
         
         now_msk = datetime.now(MSK)
         calc_date = now_msk.date()
@@ -114,6 +120,9 @@ class DailyCalculationJob:
                         self._diagnostics["indicators_failed"] += 1
                     await asyncio.sleep(0.3)
                 
+                # Сохранение инструментов и индикаторов — одной пачкой
+                await self._save_indicator_batch(calc_date)
+                
                 # 3. Фьючерс Si
                 report["futures_si"] = await self._analyze_futures_si(client, calc_date)
                 
@@ -154,6 +163,13 @@ class DailyCalculationJob:
         # Основной отчёт
         await self.notifier.send_daily_report(report)
         
+        # Индикаторы посчитаны, но не записаны — сигналы по ним не сформируются
+        if diag.get("indicators_save_failed", 0) > 0:
+            await self.notifier.send_error(
+                f"Индикаторы не сохранены в БД: {diag['indicators_save_failed']} акций",
+                "Ежедневный расчёт"
+            )
+        
         # Если 0 акций — отправляем диагностику
         if report["liquid_count"] == 0:
             reasons = []
@@ -306,23 +322,62 @@ class DailyCalculationJob:
         
         return {"avg_volume_rub": sum(volumes_rub) / len(volumes_rub)}
 
-    async def _ensure_instrument(self, share: Dict) -> int:
-        """Создаёт или получает инструмент в БД, возвращает ID."""
-        instrument = await self.repo.get_instrument_by_figi(share["figi"])
-        
-        if not instrument:
-            instrument = await self.repo.upsert_instrument({
-                "figi": share["figi"],
-                "ticker": share["ticker"],
-                "name": share.get("name", share["ticker"]),
-                "instrument_type": "share",
-                "lot_size": share.get("lot", 1),
-                "is_active": True,
-                "is_liquid": True,
-                "avg_volume_rub": share.get("avg_volume_rub"),
-            })
-        
-        return instrument.id
+    async def _save_indicator_batch(self, calc_date: date):
+        """
+        Сохраняет накопленные за цикл инструменты и индикаторы.
+
+        Два запроса на весь цикл вместо get/upsert/save на каждую акцию.
+        Если пачка не сохранилась — повтор поштучно, чтобы одна битая
+        строка не стоила индикаторов всего дня.
+        """
+        if not self._indicator_batch:
+            return
+        
+        # Одна акция дважды за цикл — оставляем последний расчёт
+        batch = list({share["figi"]: (share, data) for share, data in self._indicator_batch}.values())
+        
+        try:
+            await self._save_indicator_rows(batch, calc_date)
+            logger.info("indicators_saved_to_db", count=len(batch))
+        except Exception as e:
+            logger.error("save_indicator_batch_error", count=len(batch), error=str(e))
+            for item in batch:
+                ticker = item[0]["ticker"]
+                try:
+                    await self._save_indicator_rows([item], calc_date)
+                except Exception as e:
+                    logger.error("save_indicator_error", ticker=ticker, error=str(e))
+                    self._diagnostics["indicators_save_failed"] += 1
+                    self._diagnostics["errors"].append(f"{ticker}: {str(e)[:50]}")
+        finally:
+            self._indicator_batch = []
+
+    async def _save_indicator_rows(self, batch: List[Tuple[Dict, Dict]], calc_date: date):
+        """Инструменты + индикаторы одной транзакцией."""
+        async with self.repo.uow():
+            # Как и раньше — только создаём недостающие инструменты:
+            # name, lot_size, is_liquid, avg_volume_rub существующих не трогаем
+            instrument_ids = await self.repo.upsert_instruments_bulk(
+                [
+                    {
+                        "figi": share["figi"],
+                        "ticker": share["ticker"],
+                        "name": share.get("name", share["ticker"]),
+                        "instrument_type": "share",
+                        "lot_size": share.get("lot", 1),
+                        "is_active": True,
+                        "is_liquid": True,
+                        "avg_volume_rub": share.get("avg_volume_rub"),
+                    }
+                    for share, _ in batch
+                ],
+                update_columns=(),
+            )
+            
+            await self.repo.save_indicators_bulk([
+                {**data, "instrument_id": instrument_ids[share["figi"]], "date": calc_date}
+                for share, data in batch
+            ])
 
     async def _analyze_share(
         self, 
@@ -391,39 +446,28 @@ class DailyCalculationJob:
         # Расстояние до BB Lower
         distance_to_bb_pct = (current_price - bb_lower) / current_price * 100 if current_price > 0 else 0
         
-        # === СОХРАНЕНИЕ В БД ===
-        try:
-            instrument_id = await self._ensure_instrument(share)
-            
-            await self.repo.save_indicator_daily(
-                instrument_id=instrument_id,
-                calc_date=calc_date,
-                data={
-                    "close": current_price,
-                    "atr": atr,
-                    "atr_pct": round(atr / current_price * 100, 2) if current_price > 0 else 0,
-                    "bb_upper": indicators["bb_upper"],
-                    "bb_middle": bb_middle,
-                    "bb_lower": bb_lower,
-                    "distance_to_bb_pct": round(distance_to_bb_pct, 2),
-                    # EMA (13/26)
-                    "ema_13": ema_13,
-                    "ema_26": ema_26,
-                    "ema_trend": ema_trend,
-                    "ema_diff_pct": ema_diff_pct,
-                    "ema_13_slope": indicators["ema_13_slope"],
-                    "ema_26_slope": indicators["ema_26_slope"],
-                    "distance_to_ema_13_pct": distance_to_ema_13_pct,
-                    "distance_to_ema_26_pct": distance_to_ema_26_pct,
-                    # Ликвидность
-                    "volume_rub": share.get("avg_volume_rub"),
-                    "spread_pct": share.get("spread_pct"),
-                }
-            )
-            logger.info("indicators_saved_to_db", ticker=ticker, 
-                       ema_trend=ema_trend, ema_13=ema_13, ema_26=ema_26)
-        except Exception as e:
-            logger.error("save_indicator_error", ticker=ticker, error=str(e))
+        # === СОХРАНЕНИЕ В БД (пачкой в конце цикла) ===
+        self._indicator_batch.append((share, {
+            "close": current_price,
+            "atr": atr,
+            "atr_pct": round(atr / current_price * 100, 2) if current_price > 0 else 0,
+            "bb_upper": indicators["bb_upper"],
+            "bb_middle": bb_middle,
+            "bb_lower": bb_lower,
+            "distance_to_bb_pct": round(distance_to_bb_pct, 2),
+            # EMA (13/26)
+            "ema_13": ema_13,
+            "ema_26": ema_26,
+            "ema_trend": ema_trend,
+            "ema_diff_pct": ema_diff_pct,
+            "ema_13_slope": indicators["ema_13_slope"],
+            "ema_26_slope": indicators["ema_26_slope"],
+            "distance_to_ema_13_pct": distance_to_ema_13_pct,
+            "distance_to_ema_26_pct": distance_to_ema_26_pct,
+            # Ликвидность
+            "volume_rub": share.get("avg_volume_rub"),
+            "spread_pct": share.get("spread_pct"),
+        }))
         
         # === R:R 1:3 РАСЧЁТ ===
         entry_price = bb_lower
@@ -537,39 +581,41 @@ class DailyCalculationJob:
         
         # === СОХРАНЕНИЕ В БД ===
         try:
-            instrument = await self.repo.get_instrument_by_figi(si_future["figi"])
-            if not instrument:
-                instrument = await self.repo.upsert_instrument({
-                    "figi": si_future["figi"],
-                    "ticker": si_future["ticker"],
-                    "name": si_future.get("name", si_future["ticker"]),
-                    "instrument_type": "future",
-                    "lot_size": si_future.get("lot", 1),
-                    "basic_asset": si_future.get("basic_asset"),
-                    "expiration_date": si_future.get("expiration"),
-                    "is_active": True,
-                })
+            # Инструмент + индикатор — одна транзакция (один COMMIT)
+            async with self.repo.uow():
+                instrument = await self.repo.get_instrument_by_figi(si_future["figi"])
+                if not instrument:
+                    instrument = await self.repo.upsert_instrument({
+                        "figi": si_future["figi"],
+                        "ticker": si_future["ticker"],
+                        "name": si_future.get("name", si_future["ticker"]),
+                        "instrument_type": "future",
+                        "lot_size": si_future.get("lot", 1),
+                        "basic_asset": si_future.get("basic_asset"),
+                        "expiration_date": si_future.get("expiration"),
+                        "is_active": True,
+                    })
             
-            await self.repo.save_indicator_daily(
-                instrument_id=instrument.id,
-                calc_date=calc_date,
-                data={
-                    "close": price,
-                    "atr": atr,
-                    "atr_pct": round(atr / price * 100, 2) if price > 0 else 0,
-                    "bb_upper": indicators["bb_upper"],
-                    "bb_middle": indicators["bb_middle"],
-                    "bb_lower": bb_lower,
-                    "ema_13": ema_13,
-                    "ema_26": ema_26,
-                    "ema_trend": ema_trend,
-                    "ema_diff_pct": indicators["ema_diff_pct"],
-                    "ema_13_slope": indicators["ema_13_slope"],
-                    "ema_26_slope": indicators["ema_26_slope"],
-                    "distance_to_ema_13_pct": indicators["distance_to_ema_13_pct"],
-                    "distance_to_ema_26_pct": indicators["distance_to_ema_26_pct"],
-                }
-            )
+                await self.repo.save_indicator_daily(
+                    instrument_id=instrument.id,
+                    calc_date=calc_date,
+                    data={
+                        "close": price,
+                        "atr": atr,
+                        "atr_pct": round(atr / price * 100, 2) if price > 0 else 0,
+                        "bb_upper": indicators["bb_upper"],
+                        "bb_middle": indicators["bb_middle"],
+                        "bb_lower": bb_lower,
+                        "ema_13": ema_13,
+                        "ema_26": ema_26,
+                        "ema_trend": ema_trend,
+                        "ema_diff_pct": indicators["ema_diff_pct"],
+                        "ema_13_slope": indicators["ema_13_slope"],
+                        "ema_26_slope": indicators["ema_26_slope"],
+                        "distance_to_ema_13_pct": indicators["distance_to_ema_13_pct"],
+                        "distance_to_ema_26_pct": indicators["distance_to_ema_26_pct"],
+                    }
+                )
             logger.info("si_indicators_saved", ticker=si_future["ticker"], ema_trend=ema_trend)
         except Exception as e:
             logger.error("save_si_indicator_error", error=str(e))